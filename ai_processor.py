@@ -1,18 +1,70 @@
 # ai_processor.py
-from typing import List
-import groq
-from models import Article
+import json
+from typing import TYPE_CHECKING, List, Optional
+from models import Article, ArticleInsights
+from config import LLM_SETTINGS, ARTICLE_SETTINGS
+from content_prep import (
+    NO_CONTENT_SUMMARY,
+    clean_content,
+    split_into_chunks,
+    truncate_to_tokens,
+)
+from llm_cache import LLMCache
+from llm_scheduler import LLMScheduler, estimate_tokens
+from metrics import LLM_TASK_SECONDS
 import asyncio
 import logging
 
+if TYPE_CHECKING:
+    import groq
+
+# Rough prompt tokens per article for its markup in a batch request
+BATCH_ITEM_OVERHEAD = 20
+
+# Bump a version whenever its prompt changes so stale cached results are ignored
+PROMPT_VERSIONS = {
+    "summary": 1,
+    "keywords": 1,
+    "insights": 1,
+    # Batch summaries have their own word limit, so they are cached apart
+    "batch_insights": 1,
+    "chunk_summary": 1,
+}
+
 
 class AIProcessor:
-    def __init__(self, api_key: str):
-        self.client = groq.Groq(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[LLMCache] = None,
+        base_url: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.scheduler = LLMScheduler(client_factory=self.create_client)
+        self.model = LLM_SETTINGS["model"]
+        self.cache = cache if cache is not None else LLMCache()
         self.logger = logging.getLogger(__name__)
 
+    def create_client(self) -> "groq.AsyncGroq":
+        # Retries are owned by the scheduler, not the client; groq is slow to
+        # import, so it is only loaded once a client is needed
+        import groq
+
+        return groq.AsyncGroq(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0
+        )
+
+    def _cache_key(self, task: str, content: str) -> str:
+        return LLMCache.make_key(task, content, self.model, PROMPT_VERSIONS[task])
+
     async def generate_summary(self, content: str) -> str:
         """Generate a summary of the article content using Claude."""
+        cache_key = self._cache_key("summary", content)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             prompt = f"""
             Please provide a concise summary of the following article. 
@@ -22,19 +74,22 @@ class AIProcessor:
             {content}
             """
 
-            completion = await self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model="mixtral-8x7b-32768",
-                temperature=0.3,
-                max_tokens=500,
-            )
+            with LLM_TASK_SECONDS.time(task="summary"):
+                completion = await self.scheduler.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    temperature=LLM_SETTINGS["temperature"],
+                    max_tokens=500,
+                )
 
-            return completion.choices[0].message.content
+            summary = completion.choices[0].message.content
+            self.cache.set(cache_key, summary)
+            return summary
 
         except Exception as e:
             self.logger.error(f"Error generating summary: {str(e)}")
@@ -42,6 +97,11 @@ class AIProcessor:
 
     async def extract_keywords(self, content: str) -> List[str]:
         """Extract relevant keywords from the article content."""
+        cache_key = self._cache_key("keywords", content)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             prompt = f"""
             Please extract 5-7 relevant keywords from the following article content.
@@ -51,41 +111,322 @@ class AIProcessor:
             {content}
             """
 
-            completion = await self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model="mixtral-8x7b-32768",
-                temperature=0.3,
-                max_tokens=100,
-            )
+            with LLM_TASK_SECONDS.time(task="keywords"):
+                completion = await self.scheduler.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    temperature=LLM_SETTINGS["temperature"],
+                    max_tokens=100,
+                )
 
             keywords = completion.choices[0].message.content.split(",")
-            return [keyword.strip() for keyword in keywords]
+            keywords = [keyword.strip() for keyword in keywords]
+            self.cache.set(cache_key, keywords)
+            return keywords
 
         except Exception as e:
             self.logger.error(f"Error extracting keywords: {str(e)}")
             return []
 
-    async def process_article(self, article: Article) -> Article:
-        """Process a single article by generating summary and extracting keywords."""
+    @staticmethod
+    def _clean_keywords(keywords: List[str]) -> List[str]:
+        return [keyword.strip() for keyword in keywords if keyword.strip()][
+            : ARTICLE_SETTINGS["max_keywords"]
+        ]
+
+    async def generate_insights(self, content: str) -> Optional[ArticleInsights]:
+        """Generate summary and keywords in one request with JSON output.
+
+        Returns None when the request fails or the response does not validate,
+        so callers can fall back to the separate summary and keyword calls.
+        """
+        cache_key = self._cache_key("insights", content)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return ArticleInsights(**cached)
+
         try:
-            summary = await self.generate_summary(article.content)
-            keywords = await self.extract_keywords(article.content)
+            prompt = f"""
+            Please summarize the following article and extract its keywords.
+            Focus the summary on the key points and main takeaways and keep it
+            under 200 words. Extract 5-7 relevant keywords.
 
-            article.summary = summary
-            article.keywords = keywords
+            Respond with only a JSON object of the form:
+            {{"summary": "<summary>", "keywords": ["<keyword>", ...]}}
 
-            return article
+            Article:
+            {content}
+            """
+
+            with LLM_TASK_SECONDS.time(task="insights"):
+                completion = await self.scheduler.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    temperature=LLM_SETTINGS["temperature"],
+                    max_tokens=600,
+                    response_format={"type": "json_object"},
+                )
+
+            insights = ArticleInsights.model_validate_json(
+                completion.choices[0].message.content
+            )
+            insights.keywords = self._clean_keywords(insights.keywords)
+            self.cache.set(cache_key, insights.model_dump())
+            return insights
+
+        except Exception as e:
+            self.logger.warning(f"Error generating structured insights: {str(e)}")
+            return None
+
+    async def summarize_chunk(self, chunk: str) -> Optional[str]:
+        """Summarize one part of a long article; the map step of map-reduce."""
+        cache_key = self._cache_key("chunk_summary", chunk)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            prompt = f"""
+            The following text is one part of a longer article. Summarize it
+            in under 100 words, keeping names, figures and key claims.
+
+            Text:
+            {chunk}
+            """
+
+            with LLM_TASK_SECONDS.time(task="chunk_summary"):
+                completion = await self.scheduler.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    temperature=LLM_SETTINGS["temperature"],
+                    max_tokens=200,
+                )
+
+            summary = completion.choices[0].message.content
+            self.cache.set(cache_key, summary)
+            return summary
+
+        except Exception as e:
+            self.logger.error(f"Error summarizing article chunk: {str(e)}")
+            return None
+
+    async def prepare_content(self, content: str) -> Optional[str]:
+        """Reduce article content to what the LLM needs, within a token budget.
+
+        Boilerplate and repeated lines are dropped, and texts shorter than
+        ``min_article_length`` return None. Texts up to
+        ``map_reduce_threshold`` tokens are trimmed to ``max_content_tokens``;
+        longer ones are split into at most ``max_chunks`` chunks that are
+        summarized concurrently, and the joined chunk summaries stand in for
+        the text.
+        """
+        text = clean_content(content)
+        if len(text) < ARTICLE_SETTINGS["min_article_length"]:
+            return None
+
+        budget = ARTICLE_SETTINGS["max_content_tokens"]
+        if estimate_tokens(text) <= ARTICLE_SETTINGS["map_reduce_threshold"]:
+            return truncate_to_tokens(text, budget)
+
+        chunks = split_into_chunks(text, ARTICLE_SETTINGS["chunk_tokens"])
+        chunks = chunks[: ARTICLE_SETTINGS["max_chunks"]]
+        summaries = await asyncio.gather(
+            *(self.summarize_chunk(chunk) for chunk in chunks)
+        )
+        summaries = [summary for summary in summaries if summary]
+        if not summaries:
+            return truncate_to_tokens(text, budget)
+        return truncate_to_tokens("\n\n".join(summaries), budget)
+
+    def pack_batches(self, contents: List[str]) -> List[List[int]]:
+        """Group content indices into batches within the batch token budget."""
+        budget = LLM_SETTINGS["batch_token_budget"]
+        batches, current, tokens = [], [], 0
+        for index, content in enumerate(contents):
+            cost = estimate_tokens(content) + BATCH_ITEM_OVERHEAD
+            if current and (
+                tokens + cost > budget
+                or len(current) >= LLM_SETTINGS["batch_max_articles"]
+            ):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(index)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def generate_batch_insights(
+        self, contents: List[str]
+    ) -> List[Optional[ArticleInsights]]:
+        """Summarize several articles in one request with JSON output.
+
+        Articles are numbered in the prompt and the results are matched back
+        by number. Returns one entry per content, None where the response has
+        no valid result for it. Results are cached under their own task key,
+        since the batch prompt asks for shorter summaries than
+        ``generate_insights``.
+        """
+        results: List[Optional[ArticleInsights]] = [None] * len(contents)
+        try:
+            articles_text = "\n\n".join(
+                f'<article id="{number}">\n{content}\n</article>'
+                for number, content in enumerate(contents, 1)
+            )
+            prompt = f"""
+            Please summarize each of the following articles and extract its
+            keywords. Focus each summary on the key points and main takeaways
+            and keep it under 100 words. Extract 5-7 relevant keywords per
+            article.
+
+            Respond with only a JSON object with one result per article:
+            {{"results": [{{"id": "<article id>", "summary": "<summary>", "keywords": ["<keyword>", ...]}}, ...]}}
+
+            Articles:
+            {articles_text}
+            """
+
+            with LLM_TASK_SECONDS.time(task="batch_insights"):
+                completion = await self.scheduler.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    temperature=LLM_SETTINGS["temperature"],
+                    max_tokens=LLM_SETTINGS["batch_output_tokens"] * len(contents),
+                    response_format={"type": "json_object"},
+                )
+
+            payload = json.loads(completion.choices[0].message.content)
+            items = payload.get("results", []) if isinstance(payload, dict) else []
+        except Exception as e:
+            self.logger.warning(f"Error generating batch insights: {str(e)}")
+            return results
+
+        for item in items:
+            try:
+                number = int(str(item["id"]).strip())
+                insights = ArticleInsights.model_validate(item)
+            except Exception:
+                continue
+            if 1 <= number <= len(contents) and results[number - 1] is None:
+                insights.keywords = self._clean_keywords(insights.keywords)
+                content = contents[number - 1]
+                self.cache.set(
+                    self._cache_key("batch_insights", content), insights.model_dump()
+                )
+                results[number - 1] = insights
+        return results
+
+    async def _summarize(self, article: Article, content: str) -> Article:
+        """Attach a summary and keywords generated from prepared content."""
+        insights = None
+        if LLM_SETTINGS["combined_mode"]:
+            insights = await self.generate_insights(content)
+
+        if insights is not None:
+            summary, keywords = insights.summary, insights.keywords
+        else:
+            summary = await self.generate_summary(content)
+            keywords = await self.extract_keywords(content)
+
+        article.summary = summary
+        article.keywords = keywords
+        return article
+
+    @staticmethod
+    def _use_as_summary(article: Article) -> Article:
+        # Too short to be worth a request; the text is its own summary
+        article.summary = clean_content(article.content) or NO_CONTENT_SUMMARY
+        article.keywords = []
+        return article
+
+    async def process_article(self, article: Article) -> Article:
+        """Process a single article by generating summary and extracting keywords."""
+        try:
+            content = await self.prepare_content(article.content)
+            if content is None:
+                return self._use_as_summary(article)
+            return await self._summarize(article, content)
 
         except Exception as e:
             self.logger.error(f"Error processing article: {str(e)}")
             return article
 
     async def process_articles(self, articles: List[Article]) -> List[Article]:
-        """Process multiple articles concurrently."""
-        tasks = [self.process_article(article) for article in articles]
-        return await asyncio.gather(*tasks)
+        """Process multiple articles concurrently.
+
+        In batch mode the articles are packed into shared structured
+        requests within ``batch_token_budget``; articles a batch response
+        leaves out or returns malformed, and articles too long to share a
+        request, are processed on their own.
+        """
+        if not LLM_SETTINGS["batch_mode"]:
+            tasks = [self.process_article(article) for article in articles]
+            return await asyncio.gather(*tasks)
+
+        contents = await asyncio.gather(
+            *(self.prepare_content(article.content) for article in articles)
+        )
+        singles, pending, pending_contents = [], [], []
+        for article, content in zip(articles, contents):
+            if content is None:
+                self._use_as_summary(article)
+                continue
+            cached = self.cache.get(self._cache_key("batch_insights", content))
+            if cached is not None:
+                article.summary = cached["summary"]
+                article.keywords = cached["keywords"]
+            elif estimate_tokens(content) > LLM_SETTINGS["batch_token_budget"]:
+                singles.append((article, content))
+            else:
+                pending.append(article)
+                pending_contents.append(content)
+
+        batches = self.pack_batches(pending_contents)
+        batch_results = await asyncio.gather(
+            *(
+                self.generate_batch_insights([pending_contents[i] for i in batch])
+                for batch in batches
+            )
+        )
+        for batch, results in zip(batches, batch_results):
+            for index, insights in zip(batch, results):
+                article = pending[index]
+                if insights is None:
+                    singles.append((article, pending_contents[index]))
+                else:
+                    article.summary = insights.summary
+                    article.keywords = insights.keywords
+
+        if singles:
+            self.logger.info(f"Processing {len(singles)} articles individually")
+        await asyncio.gather(
+            *(self._summarize_safely(article, content) for article, content in singles)
+        )
+        return articles
+
+    async def _summarize_safely(self, article: Article, content: str) -> Article:
+        try:
+            return await self._summarize(article, content)
+        except Exception as e:
+            self.logger.error(f"Error processing article: {str(e)}")
+            return article
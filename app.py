@@ -2,26 +2,25 @@
 import streamlit as st
 import asyncio
 from datetime import datetime, timedelta
-from typing import List
-import json
-import os
-
-from models import Article, SearchQuery, WebsiteConfig
-from scraper import NewsScraperAgent
-from ai_processor import AIProcessor
-
-
-# Load configuration
-def load_website_configs() -> List[WebsiteConfig]:
-    with open("config/websites.json", "r") as f:
-        configs = json.load(f)
-    return [WebsiteConfig(**config) for config in configs]
 
+from models import Article, SearchQuery
+from columnar_store import SORT_ORDERS, ColumnarArticleStore
+from config import INGEST_SETTINGS, LLM_SETTINGS, UI_SETTINGS
+from pagination import page_size_selector, paginate
+from resources import (
+    get_ai_processor,
+    get_archive,
+    get_article_store,
+    get_article_table,
+    get_deduplicator,
+    get_scraper,
+    get_semantic_index,
+    load_website_configs,
+    refresh_articles,
+)
 
-# Initialize components
+# Shared across sessions and reruns; see resources.py
 websites_config = load_website_configs()
-scraper = NewsScraperAgent(websites_config)
-ai_processor = AIProcessor(api_key=os.getenv("GROQ_API_KEY"))
 
 # Streamlit interface
 st.title("AI Agent News Aggregator")
@@ -29,67 +28,134 @@ st.title("AI Agent News Aggregator")
 # Sidebar for filters
 st.sidebar.header("Search Filters")
 search_query = st.sidebar.text_input("Search Keywords")
-date_range = st.sidebar.date_input(
-    "Date Range", value=(datetime.now() - timedelta(days=7), datetime.now())
+default_date_range = (
+    (datetime.now() - timedelta(days=7)).date(),
+    datetime.now().date(),
 )
+date_range = st.sidebar.date_input("Date Range", value=default_date_range)
 selected_sources = st.sidebar.multiselect(
     "Select Sources", options=[config.name for config in websites_config]
 )
+orders = [order for order in SORT_ORDERS if search_query or order != "Relevance"]
+sort_order = st.sidebar.selectbox(
+    "Sort by", orders, index=orders.index("Relevance") if search_query else 0
+)
+page_size = page_size_selector("news")
+
+
+def matches_filters(article: Article, query: SearchQuery) -> bool:
+    """Check an article against the search query, date range and sources."""
+    matches_query = (
+        not query.query
+        or query.query.lower() in article.title.lower()
+        or query.query.lower() in article.summary.lower()
+    )
+    matches_date = query.date_from <= article.published_date <= query.date_to
+    matches_source = not query.sources or article.source in query.sources
+    return matches_query and matches_date and matches_source
+
+
+def render_article(article: Article):
+    st.markdown(f"## {article.title}")
+    st.markdown(f"**Source:** {article.source}")
+    st.markdown(f"**Published:** {article.published_date.strftime('%Y-%m-%d %H:%M')}")
+    st.markdown("### Summary")
+    st.write(article.summary)
+    st.markdown("### Keywords")
+    st.write(", ".join(article.keywords))
+    st.markdown(f"[Read full article]({article.url})")
+    st.markdown("---")
+
 
 # Main content area
+# While a range is being picked the widget returns only its first date, and
+# nothing once cleared; keep filtering by the last complete range meanwhile
+if len(date_range) == 2:
+    st.session_state.news_date_range = tuple(date_range)
+if "news_date_range" in st.session_state:
+    date_from, date_to = st.session_state.news_date_range
+elif date_range:
+    date_from = date_to = date_range[0]
+else:
+    date_from, date_to = default_date_range
+query = SearchQuery(
+    query=search_query,
+    date_from=datetime.combine(date_from, datetime.min.time()),
+    date_to=datetime.combine(date_to, datetime.max.time()),
+    sources=selected_sources if selected_sources else None,
+)
+
 if st.button("Fetch Latest News"):
-    with st.spinner("Fetching and processing articles..."):
-        # Create search query
-        query = SearchQuery(
-            query=search_query,
-            date_from=datetime.combine(date_range[0], datetime.min.time()),
-            date_to=datetime.combine(date_range[1], datetime.max.time()),
-            sources=selected_sources if selected_sources else None,
-        )
+    # Results stay on screen across reruns, e.g. when changing pages
+    st.session_state.news_fetched = True
 
-        # Fetch and process articles
+    # Articles are normally ingested by ingest.py and only read here
+    if INGEST_SETTINGS["ui_ingest"]:
+        status = st.empty()
+        status.info("Fetching and processing articles...")
+        live = st.empty()
+
+        # Render new articles as soon as each one is processed
         async def fetch_and_process():
-            # Scrape articles
-            results = await scraper.scrape_all_websites()
-            all_articles = []
-            for result in results:
-                if result.success:
-                    all_articles.extend(result.articles)
+            from pipeline import ArticlePipeline
 
-            # Process articles with AI
-            processed_articles = await ai_processor.process_articles(all_articles)
-            return processed_articles
+            pipeline = ArticlePipeline(
+                get_scraper(),
+                get_ai_processor().process_article,
+                store=get_article_store(),
+                deduplicator=get_deduplicator(),
+                process_batch=(
+                    get_ai_processor().process_articles
+                    if LLM_SETTINGS["batch_mode"]
+                    else None
+                ),
+            )
+            with live.container():
+                async for article in pipeline.stream():
+                    new_articles.append(article)
+                    if article.duplicate_of is None and matches_filters(article, query):
+                        render_article(article)
 
         # Run async operations
-        articles = asyncio.run(fetch_and_process())
-
-        # Filter articles based on search criteria
-        filtered_articles = []
-        for article in articles:
-            matches_query = (
-                not search_query
-                or search_query.lower() in article.title.lower()
-                or search_query.lower() in article.summary.lower()
-            )
-            matches_date = query.date_from <= article.published_date <= query.date_to
-            matches_source = not selected_sources or article.source in selected_sources
-
-            if matches_query and matches_date and matches_source:
-                filtered_articles.append(article)
-
-        # Display articles
-        for article in filtered_articles:
-            st.markdown(f"## {article.title}")
-            st.markdown(f"**Source:** {article.source}")
-            st.markdown(
-                f"**Published:** {article.published_date.strftime('%Y-%m-%d %H:%M')}"
-            )
-            st.markdown("### Summary")
-            st.write(article.summary)
-            st.markdown("### Keywords")
-            st.write(", ".join(article.keywords))
-            st.markdown(f"[Read full article]({article.url})")
-            st.markdown("---")
+        new_articles = []
+        asyncio.run(fetch_and_process())
+        get_archive().append(new_articles)
+        get_semantic_index().add_articles(new_articles)
+        refresh_articles()
+        # The new articles are part of the paged list below from now on
+        live.empty()
+        status.empty()
+
+if st.session_state.get("news_fetched"):
+    # Filter the shared article table, ranked by the index for keyword
+    # searches; near-duplicates share their canonical article's summary
+    results = ColumnarArticleStore.filter_table(
+        get_article_table(
+            None if query.sources is None else tuple(query.sources),
+            date_from,
+            date_to,
+        ),
+        sources=query.sources,
+        date_from=query.date_from,
+        date_to=query.date_to,
+        include_duplicates=False,
+    )
+    if query.query:
+        results = ColumnarArticleStore.take_ids(
+            results,
+            get_article_store().search_ids(query, limit=UI_SETTINGS["search_limit"]),
+        )
+    results = ColumnarArticleStore.sort_table(results, sort_order)
+
+    # Only the current page is materialized and rendered
+    start, stop = paginate(
+        results.num_rows,
+        page_size,
+        key="news",
+        reset_on=(query.model_dump_json(), sort_order, page_size),
+    )
+    for article in ColumnarArticleStore.to_articles(results.slice(start, stop - start)):
+        render_article(article)
 
 # Add a footer
 st.markdown("---")
@@ -0,0 +1,402 @@
+# article_store.py
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import DEDUP_SETTINGS, STORAGE_SETTINGS
+from dedup import fingerprint
+from models import Article, SearchQuery
+
+# Summaries that mark a failed AI pass; such articles are processed again
+FAILED_SUMMARIES = {"", "Error generating summary"}
+
+# bm25 weights for the title, summary, keywords and content columns
+SEARCH_WEIGHTS = (10.0, 5.0, 8.0, 1.0)
+
+ARTICLE_COLUMNS = (
+    "articles.id, articles.title, articles.url, articles.source, "
+    "articles.published_date, articles.summary, articles.keywords, "
+    "articles.content, articles.processed_date, articles.duplicate_of"
+)
+
+# Columns added after the first release, created on existing databases
+ADDED_COLUMNS = {"duplicate_of": "TEXT", "minhash": "BLOB"}
+
+
+def content_hash(article: Article) -> str:
+    """Hash the scraped fields of an article to detect changed content."""
+    payload = (
+        f"{article.title}\n{article.published_date.isoformat()}\n{article.content}"
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """Persistent SQLite store of processed articles keyed by article id."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or STORAGE_SETTINGS["article_db_path"]
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets the UI read while the ingest process writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                published_date TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                keywords TEXT NOT NULL,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                processed_date TEXT NOT NULL,
+                duplicate_of TEXT,
+                minhash BLOB
+            )
+            """)
+        self._add_missing_columns()
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_date)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url)"
+        )
+        self._create_search_index()
+        self._conn.commit()
+
+    def _add_missing_columns(self) -> None:
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        for name, column_type in ADDED_COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE articles ADD COLUMN {name} {column_type}"
+                )
+
+    def _create_search_index(self) -> None:
+        """Create the FTS5 index over title, summary, keywords and content.
+
+        Triggers keep the index in sync with the articles table, so it is
+        updated incrementally as articles are ingested.
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        ).fetchone()
+        if exists:
+            return
+
+        self._conn.executescript("""
+            CREATE VIRTUAL TABLE articles_fts USING fts5(
+                title, summary, keywords, content,
+                content='articles', content_rowid='rowid'
+            );
+            CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, summary, keywords, content)
+                VALUES (new.rowid, new.title, new.summary, new.keywords, new.content);
+            END;
+            CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, keywords, content)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.keywords, old.content);
+            END;
+            CREATE TRIGGER articles_fts_update AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, keywords, content)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.keywords, old.content);
+                INSERT INTO articles_fts (rowid, title, summary, keywords, content)
+                VALUES (new.rowid, new.title, new.summary, new.keywords, new.content);
+            END;
+            -- Index articles stored before the search index existed
+            INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+            """)
+
+    def filter_new(self, articles: Iterable[Article]) -> List[Article]:
+        """Return the articles that are not stored yet or whose content changed.
+
+        Stored articles whose AI pass failed are returned as well so they get
+        another attempt.
+        """
+        articles = list(articles)
+        ids = [article.id for article in articles]
+        stored = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, content_hash, summary FROM articles WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                stored.update({row[0]: (row[1], row[2]) for row in rows})
+
+        new_articles = []
+        for article in articles:
+            previous = stored.get(article.id)
+            if (
+                previous is None
+                or previous[0] != content_hash(article)
+                or previous[1] in FAILED_SUMMARIES
+            ):
+                new_articles.append(article)
+        return new_articles
+
+    def upsert(self, articles: Iterable[Article]) -> None:
+        """Insert or update processed articles."""
+        rows = []
+        for article in articles:
+            value = fingerprint(article.content)
+            rows.append(
+                (
+                    article.id,
+                    article.title,
+                    str(article.url),
+                    article.source,
+                    article.published_date.isoformat(),
+                    article.summary,
+                    json.dumps(article.keywords),
+                    article.content,
+                    content_hash(article),
+                    article.processed_date.isoformat(),
+                    None if value is None else value.tobytes(),
+                    article.duplicate_of,
+                )
+            )
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO articles (
+                    id, title, url, source, published_date, summary, keywords,
+                    content, content_hash, processed_date, minhash, duplicate_of
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    title = excluded.title,
+                    url = excluded.url,
+                    source = excluded.source,
+                    published_date = excluded.published_date,
+                    summary = excluded.summary,
+                    keywords = excluded.keywords,
+                    content = excluded.content,
+                    content_hash = excluded.content_hash,
+                    processed_date = excluded.processed_date,
+                    minhash = excluded.minhash,
+                    duplicate_of = excluded.duplicate_of
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _filter_clauses(
+        sources: Optional[List[str]],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+    ) -> Tuple[List[str], List[str]]:
+        clauses, params = [], []
+        if sources:
+            clauses.append(f"articles.source IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+        if date_from is not None:
+            clauses.append("articles.published_date >= ?")
+            params.append(date_from.isoformat())
+        if date_to is not None:
+            clauses.append("articles.published_date <= ?")
+            params.append(date_to.isoformat())
+        return clauses, params
+
+    @staticmethod
+    def _row_to_article(row: tuple) -> Article:
+        return Article(
+            id=row[0],
+            title=row[1],
+            url=row[2],
+            source=row[3],
+            published_date=datetime.fromisoformat(row[4]),
+            summary=row[5],
+            keywords=json.loads(row[6]),
+            content=row[7],
+            processed_date=datetime.fromisoformat(row[8]),
+            duplicate_of=row[9],
+        )
+
+    def get_articles(
+        self,
+        sources: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Article]:
+        """Load stored articles, newest first, optionally filtered."""
+        clauses, params = self._filter_clauses(sources, date_from, date_to)
+
+        sql = f"SELECT {ARTICLE_COLUMNS} FROM articles"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY articles.published_date DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [self._row_to_article(row) for row in rows]
+
+    def get_articles_by_url(self, urls: Iterable[str]) -> Dict[str, Article]:
+        """Stored articles keyed by URL; the latest processed one per URL."""
+        urls = list(dict.fromkeys(urls))
+        articles = {}
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT {ARTICLE_COLUMNS} FROM articles "
+                    f"WHERE url IN ({placeholders}) ORDER BY processed_date",
+                    chunk,
+                ).fetchall()
+                articles.update({row[2]: self._row_to_article(row) for row in rows})
+        return articles
+
+    def get_links(self, ids: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        """Title and URL of the given articles, keyed by id."""
+        ids = list(dict.fromkeys(ids))
+        links = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, title, url FROM articles WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                links.update({row[0]: (row[1], row[2]) for row in rows})
+        return links
+
+    def get_article(self, article_id: str) -> Optional[Article]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {ARTICLE_COLUMNS} FROM articles WHERE id = ?", (article_id,)
+            ).fetchone()
+        return None if row is None else self._row_to_article(row)
+
+    def fingerprints(self) -> List[Tuple[str, np.ndarray]]:
+        """MinHash signatures of the stored articles that are not duplicates.
+
+        Articles stored without a signature, or with one of another length,
+        are signed from their content and updated.
+        """
+        size = DEDUP_SETTINGS["num_perm"] * 4
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, minhash FROM articles WHERE duplicate_of IS NULL"
+            ).fetchall()
+        signatures = [
+            (article_id, np.frombuffer(value, dtype="<u4"))
+            for article_id, value in rows
+            if value is not None and len(value) == size
+        ]
+
+        missing = [
+            article_id
+            for article_id, value in rows
+            if value is None or len(value) != size
+        ]
+        updates = []
+        for start in range(0, len(missing), 500):
+            ids = missing[start : start + 500]
+            with self._lock:
+                contents = self._conn.execute(
+                    "SELECT id, content FROM articles "
+                    f"WHERE id IN ({', '.join('?' * len(ids))})",
+                    ids,
+                ).fetchall()
+            for article_id, content in contents:
+                value = fingerprint(content)
+                if value is not None:
+                    signatures.append((article_id, value))
+                    updates.append((value.tobytes(), article_id))
+        if updates:
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE articles SET minhash = ? WHERE id = ?", updates
+                )
+                self._conn.commit()
+        return signatures
+
+    def _search_rows(
+        self, columns: str, query: SearchQuery, limit: Optional[int]
+    ) -> List[tuple]:
+        terms = re.findall(r"\w+", query.query.lower())
+        clauses, params = self._filter_clauses(
+            query.sources, query.date_from, query.date_to
+        )
+        if terms:
+            match = " ".join(f'"{term}"' for term in terms) + "*"
+            weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+            sql = (
+                f"SELECT {columns} FROM articles_fts "
+                "JOIN articles ON articles.rowid = articles_fts.rowid "
+                "WHERE articles_fts MATCH ?"
+            )
+            for clause in clauses:
+                sql += f" AND {clause}"
+            sql += (
+                f" ORDER BY bm25(articles_fts, {weights}), "
+                "articles.published_date DESC"
+            )
+            params = [match] + params
+        else:
+            sql = f"SELECT {columns} FROM articles"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += " ORDER BY articles.published_date DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def search(self, query: SearchQuery, limit: Optional[int] = 100) -> List[Article]:
+        """Rank stored articles against a multi-term query.
+
+        Every term must match the title, summary, keywords or content (the
+        last term also matches as a prefix); results are ranked by bm25 with
+        title and keyword matches weighted highest. The query's sources and
+        date range are applied as predicates in the same statement. An empty
+        query returns the newest articles, as ``get_articles`` does.
+        """
+        rows = self._search_rows(ARTICLE_COLUMNS, query, limit)
+        return [self._row_to_article(row) for row in rows]
+
+    def search_ids(self, query: SearchQuery, limit: Optional[int] = 100) -> List[str]:
+        """Ids of the articles ``search`` returns, in the same order.
+
+        Skips loading the rows, so callers that already hold the article
+        table can rank far more results.
+        """
+        return [row[0] for row in self._search_rows("articles.id", query, limit)]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
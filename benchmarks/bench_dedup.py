@@ -0,0 +1,162 @@
+# benchmarks/bench_dedup.py
+"""Measure near-duplicate recall on edited copies of real texts.
+
+The base texts are docstrings of standard library modules (40 to 1000
+words), so the benchmark runs offline. Each is indexed once, then edited
+the way syndicated copies differ: a reworded lead, an added byline and
+footer, a trimmed closing paragraph, and scattered word edits. Recall is
+the share of edited copies matched to their original; false positives are
+base texts matched to a different base text while indexing. Short texts
+lose most of their shingles when every edit is combined, so --min-recall
+only gates the single edits.
+
+    python -m benchmarks.bench_dedup --texts 300 --min-recall 0.9
+"""
+
+import argparse
+import importlib
+import inspect
+import os
+import random
+import sys
+import time
+import warnings
+from typing import Callable, Dict, List
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from dedup import DuplicateIndex, fingerprint
+
+MODULES = (
+    "argparse asyncio collections concurrent.futures contextlib csv dataclasses "
+    "datetime decimal difflib email enum fractions functools heapq http.client "
+    "inspect ipaddress json logging pathlib pickle queue random re sched "
+    "selectors shutil smtplib socket sqlite3 ssl statistics string subprocess "
+    "tarfile tempfile textwrap threading traceback typing unittest "
+    "urllib.request uuid weakref xml.etree.ElementTree zipfile"
+).split()
+
+BYLINES = ("By Jane Doe, Reuters", "By Sam Lee | AP", "Staff and wire reports")
+FOOTER = "Copyright 2026 The Associated Press. All rights reserved."
+
+
+def corpus(limit: int, min_words: int = 40, max_words: int = 1000) -> List[str]:
+    """Distinct docstrings of standard library modules, classes and functions."""
+    texts, seen = [], set()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name in MODULES:
+            module = importlib.import_module(name)
+            objects = [module] + [
+                obj
+                for obj in vars(module).values()
+                if (inspect.isclass(obj) or inspect.isfunction(obj))
+                and getattr(obj, "__module__", None) == name
+            ]
+            for obj in objects:
+                doc = obj.__doc__ if isinstance(obj.__doc__, str) else ""
+                words = doc.split()
+                text = " ".join(words)
+                if min_words <= len(words) <= max_words and text not in seen:
+                    seen.add(text)
+                    texts.append(text)
+    random.Random(0).shuffle(texts)
+    return texts[:limit]
+
+
+def edit_words(text: str, rate: float, rng: random.Random, vocabulary: List[str]):
+    """Delete, replace or insert about ``rate`` of the words."""
+    words = []
+    for word in text.split():
+        roll = rng.random()
+        if roll < rate / 3:
+            continue
+        if roll < 2 * rate / 3:
+            words.append(rng.choice(vocabulary))
+        elif roll < rate:
+            words.extend([word, rng.choice(vocabulary)])
+        else:
+            words.append(word)
+    return " ".join(words)
+
+
+def edits(vocabulary: List[str]) -> Dict[str, Callable[[str, random.Random], str]]:
+    def reword_lead(text, rng):
+        words = text.split()
+        lead = [rng.choice(vocabulary) for _ in range(min(12, len(words) // 4))]
+        return " ".join(lead + words[len(lead) :])
+
+    def byline(text, rng):
+        return f"{rng.choice(BYLINES)}. {text} {FOOTER}"
+
+    def trim(text, rng):
+        words = text.split()
+        return " ".join(words[: len(words) - len(words) // 6])
+
+    return {
+        "words 1%": lambda text, rng: edit_words(text, 0.01, rng, vocabulary),
+        "words 5%": lambda text, rng: edit_words(text, 0.05, rng, vocabulary),
+        "words 10%": lambda text, rng: edit_words(text, 0.10, rng, vocabulary),
+        "reworded lead": reword_lead,
+        "byline+footer": byline,
+        "trimmed ending": trim,
+        "all of the above": lambda text, rng: edit_words(
+            trim(byline(reword_lead(text, rng), rng), rng), 0.05, rng, vocabulary
+        ),
+    }
+
+
+def measure(texts: List[str], seed: int = 1) -> Dict[str, float]:
+    """Recall per edit kind, plus the false-positive rate and lookup time."""
+    index = DuplicateIndex()
+    false_positives = 0
+    for i, text in enumerate(texts):
+        signature = fingerprint(text)
+        if index.query(signature) is not None:
+            false_positives += 1
+        index.add(str(i), signature)
+
+    rng = random.Random(seed)
+    vocabulary = [word for text in texts for word in text.split()]
+    results = {"false positives": false_positives / len(texts)}
+    started, lookups = time.perf_counter(), 0
+    for name, edit in edits(vocabulary).items():
+        found = 0
+        for i, text in enumerate(texts):
+            found += index.query(fingerprint(edit(text, rng))) == str(i)
+            lookups += 1
+        results[name] = found / len(texts)
+    results["ms per lookup"] = (time.perf_counter() - started) * 1000 / lookups
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=300)
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.0,
+        help="Fail if any single edit is recalled less often, e.g. 0.9",
+    )
+    args = parser.parse_args()
+
+    texts = corpus(args.texts)
+    results = measure(texts)
+    print(f"{len(texts)} texts")
+    for name, value in results.items():
+        print(f"  {name:<20}{value * (1 if name == 'ms per lookup' else 100):8.1f}")
+
+    recalls = {
+        name: value
+        for name, value in results.items()
+        if name not in ("false positives", "ms per lookup", "all of the above")
+    }
+    failed = [name for name, value in recalls.items() if value < args.min_recall]
+    if failed:
+        print(f"FAILED: recall below {args.min_recall:.0%} for {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
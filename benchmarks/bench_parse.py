@@ -0,0 +1,67 @@
+# benchmarks/bench_parse.py
+"""Compare the parse modes on the fixture pages.
+
+The committed fixtures are synthesized from the selectors, not real pages
+(see benchmarks.record_fixtures), so re-record them with --live for
+real-page numbers.
+
+python -m benchmarks.bench_parse --iterations 20
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from benchmarks.record_fixtures import fixture_path
+from config import WEBSITE_CONFIGS
+from models import WebsiteConfig
+from parsing import PARSE_MODES, extract_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    totals = {mode: 0.0 for mode in PARSE_MODES}
+    header = "".join(f"{mode:>14}" for mode in PARSE_MODES)
+    print(f"{'source':<20}{'articles':>9}{header}   (ms/page)")
+
+    for key, config in WEBSITE_CONFIGS.items():
+        path = fixture_path(key)
+        if not os.path.exists(path):
+            print(f"{key:<20} missing fixture, run benchmarks.record_fixtures")
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        website = WebsiteConfig(**config)
+
+        row, counts = [], set()
+        for mode in PARSE_MODES:
+            # Warm up so selector compilation is not part of the measurement
+            records, _ = extract_records(html, website, mode)
+            counts.add(len(records))
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                extract_records(html, website, mode)
+            elapsed = (time.perf_counter() - started) / args.iterations
+            totals[mode] += elapsed
+            row.append(f"{elapsed * 1000:14.2f}")
+
+        mismatch = "" if len(counts) == 1 else "  (article counts differ!)"
+        print(f"{key:<20}{max(counts):>9}{''.join(row)}{mismatch}")
+
+    baseline = totals["html.parser"]
+    print(
+        f"{'total':<20}{'':>9}"
+        + "".join(f"{totals[mode] * 1000:14.2f}" for mode in PARSE_MODES)
+    )
+    for mode in PARSE_MODES:
+        if totals[mode]:
+            print(f"{mode}: {baseline / totals[mode]:.1f}x vs html.parser")
+
+
+if __name__ == "__main__":
+    main()
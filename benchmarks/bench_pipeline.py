@@ -0,0 +1,263 @@
+# benchmarks/bench_pipeline.py
+"""Offline benchmark of the scraping and LLM stages.
+
+Runs NewsScraperAgent.scrape_all_websites against the fixture pages and
+AIProcessor.process_articles against a local Groq-compatible stub, then
+reports throughput, per-stage p50/p99 latency and peak RSS.
+
+    python -m benchmarks.bench_pipeline --rounds 3 --llm-latency 0.2 \\
+        --rate-limit-ratio 0.05 --json results.json
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+# The benchmark never talks to the real API
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from ai_processor import AIProcessor
+from article_store import FAILED_SUMMARIES
+from benchmarks.stub_server import StubServer
+from config import LLM_SETTINGS, WEBSITE_CONFIGS
+from http_cache import HTTPCache
+from llm_cache import LLMCache
+from llm_scheduler import LLMScheduler
+from models import Article, WebsiteConfig
+from scraper import NewsScraperAgent
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed(samples: List[float], func):
+    """Wrap a sync or async callable so each call's duration is recorded."""
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def stage_report(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+async def bench_scrape(
+    server: StubServer, rounds: int, parse_workers: int, workdir: str
+) -> Tuple[Dict[str, dict], List[Article]]:
+    configs = [
+        WebsiteConfig(**{**config, "url": server.site_url(key)})
+        for key, config in WEBSITE_CONFIGS.items()
+    ]
+    # The stub sends no validators, so every round fetches and parses fully
+    scraper = NewsScraperAgent(
+        configs,
+        http_cache=HTTPCache(path=os.path.join(workdir, "http.sqlite3")),
+        parse_workers=parse_workers,
+    )
+
+    fetch_samples, parse_samples, site_samples = [], [], []
+    scraper.extract_records_async = timed(parse_samples, scraper.extract_records_async)
+    scraper.scrape_website = timed(site_samples, scraper.scrape_website)
+    create_fetcher = scraper.create_fetcher
+
+    def instrumented_fetcher():
+        fetcher = create_fetcher()
+        # Every fixture is served from one host; model ten distinct sources
+        fetcher.max_per_host = fetcher.max_concurrency
+        fetcher.fetch = timed(fetch_samples, fetcher.fetch)
+        return fetcher
+
+    scraper.create_fetcher = instrumented_fetcher
+
+    articles: List[Article] = []
+    total_articles, wall = 0, 0.0
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            results = await scraper.scrape_all_websites()
+            wall += time.perf_counter() - started
+            articles = [
+                a for result in results if result.success for a in result.articles
+            ]
+            total_articles += len(articles)
+    finally:
+        scraper.close()
+
+    return {
+        "scrape": {
+            "articles": total_articles,
+            "seconds": wall,
+            "articles_per_sec": total_articles / wall if wall else 0.0,
+            "fetch": stage_report(fetch_samples),
+            "parse": stage_report(parse_samples),
+            "site": stage_report(site_samples),
+        }
+    }, articles
+
+
+async def bench_llm(
+    server: StubServer, articles: List[Article], args: argparse.Namespace, workdir: str
+) -> Dict[str, dict]:
+    processor = AIProcessor(
+        api_key="benchmark",
+        cache=LLMCache(path=os.path.join(workdir, "llm.sqlite3")),
+        base_url=server.base_url,
+    )
+    processor.scheduler = LLMScheduler(
+        client_factory=processor.create_client,
+        max_in_flight=args.max_in_flight,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+    )
+    article_samples: List[float] = []
+    batch_samples: List[float] = []
+    processor.process_article = timed(article_samples, processor.process_article)
+    processor.generate_batch_insights = timed(
+        batch_samples, processor.generate_batch_insights
+    )
+
+    started = time.perf_counter()
+    processed = await processor.process_articles(articles)
+    wall = time.perf_counter() - started
+    failed = sum(1 for article in processed if article.summary in FAILED_SUMMARIES)
+
+    return {
+        "llm": {
+            "articles": len(processed),
+            "failed": failed,
+            "seconds": wall,
+            "articles_per_sec": len(processed) / wall if wall else 0.0,
+            "requests": server.llm_requests,
+            "rate_limited": server.rate_limited,
+            "article": stage_report(article_samples),
+            "batch": stage_report(batch_samples),
+        }
+    }
+
+
+def print_report(report: Dict[str, dict]) -> None:
+    scrape, llm = report["scrape"], report["llm"]
+    print(
+        f"scrape: {scrape['articles']} articles in {scrape['seconds']:.2f}s "
+        f"({scrape['articles_per_sec']:.1f}/s)"
+    )
+    for stage in ("site", "fetch", "parse"):
+        stats = scrape[stage]
+        print(
+            f"  {stage:<6} n={stats['count']:<5} p50={stats['p50_ms']:8.1f}ms "
+            f"p99={stats['p99_ms']:8.1f}ms"
+        )
+    print(
+        f"llm:    {llm['articles']} articles in {llm['seconds']:.2f}s "
+        f"({llm['articles_per_sec']:.1f}/s), {llm['requests']} requests, "
+        f"{llm['rate_limited']} rate-limited, {llm['failed']} failed"
+    )
+    for stage in ("article", "batch"):
+        stats = llm[stage]
+        if stats["count"]:
+            print(
+                f"  {stage:<7} n={stats['count']:<5} p50={stats['p50_ms']:8.1f}ms "
+                f"p99={stats['p99_ms']:8.1f}ms"
+            )
+    print(f"peak RSS: {report['peak_rss_mb']:.1f} MB")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, dict]:
+    server = StubServer(
+        llm_latency=args.llm_latency,
+        page_latency=args.page_latency,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        batch_drop_ratio=args.batch_drop_ratio,
+    )
+    await server.start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            report, articles = await bench_scrape(
+                server, args.rounds, args.parse_workers, workdir
+            )
+            report.update(await bench_llm(server, articles, args, workdir))
+    finally:
+        await server.stop()
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3, help="Scrape rounds")
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=100000)
+    parser.add_argument("--tpm", type=int, default=100000000)
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="Send one LLM request per article instead of batches",
+    )
+    parser.add_argument(
+        "--batch-drop-ratio",
+        type=float,
+        default=0.0,
+        help="Share of batch results the stub leaves out",
+    )
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    if args.no_batch:
+        LLM_SETTINGS["batch_mode"] = False
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/import_budget.py
+"""Check the import time of the entry points against a budget.
+
+Each entry point is imported in a fresh interpreter with ``python -X
+importtime`` and without GROQ_API_KEY, so the check also fails if importing
+needs an API key. Modules listed as deferred must not be imported at all;
+the UI should only load the scraping and LLM stacks when it uses them.
+
+    python -m benchmarks.import_budget --runs 5
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+# Budgets in milliseconds of cumulative import time (best of --runs)
+ENTRY_POINTS = {
+    "main": {
+        "budget_ms": 1200,
+        "deferred": ("groq", "aiohttp", "bs4", "pydantic_settings", "requests"),
+    },
+    "app": {
+        "budget_ms": 1200,
+        "deferred": ("groq", "aiohttp", "bs4", "pydantic_settings", "requests"),
+    },
+    "ingest": {"budget_ms": 1500, "deferred": ("streamlit",)},
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportTime(NamedTuple):
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def measure(module: str) -> List[ImportTime]:
+    """Import a module in a fresh interpreter and parse its import times."""
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            times.append(
+                ImportTime(name, len(indent) // 2, int(self_us), int(cumulative_us))
+            )
+    return times
+
+
+def package_totals(times: List[ImportTime]) -> Dict[str, int]:
+    """Import time per top-level package, in microseconds."""
+    totals: Dict[str, int] = defaultdict(int)
+    for entry in times:
+        totals[entry.name.split(".")[0]] += entry.self_us
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Slowest packages shown")
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, e.g. 2 on a slow CI machine",
+    )
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_POINTS))
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        spec = ENTRY_POINTS.get(module, {"budget_ms": None, "deferred": ()})
+        runs = [measure(module) for _ in range(args.runs)]
+        best = min(runs, key=lambda times: times[-1].cumulative_us)
+        total_ms = best[-1].cumulative_us / 1000
+
+        budget = spec["budget_ms"]
+        if budget is not None:
+            budget *= args.budget_scale
+            status = "ok" if total_ms <= budget else "OVER BUDGET"
+            print(f"{module}: {total_ms:.0f} ms (budget {budget:.0f} ms) {status}")
+            if total_ms > budget:
+                failures.append(f"{module} took {total_ms:.0f} ms")
+        else:
+            print(f"{module}: {total_ms:.0f} ms")
+
+        totals = package_totals(best)
+        for name, micros in sorted(totals.items(), key=lambda item: -item[1])[
+            : args.top
+        ]:
+            print(f"  {name:<24}{micros / 1000:8.1f} ms")
+
+        loaded = [name for name in spec["deferred"] if name in totals]
+        if loaded:
+            print(f"  imported eagerly: {', '.join(loaded)}")
+            failures.append(f"{module} imports {', '.join(loaded)}")
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/record_fixtures.py
+"""Write a benchmark fixture page for every WEBSITE_CONFIGS entry.
+
+By default a deterministic page is synthesized for each source from its
+selectors, so the fixtures always contain parseable articles but are much
+simpler than real pages; the committed fixtures are these synthetic ones.
+Pass --live to record the real landing pages instead.
+
+    python -m benchmarks.record_fixtures [--live] [--articles 30]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+
+from config import WEBSITE_CONFIGS
+from fetcher import AsyncFetcher
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+WORDS = (
+    "model agents training inference data neural language benchmark research "
+    "open source compute chips startup regulation safety robotics vision "
+    "enterprise cloud deployment reasoning multimodal dataset evaluation"
+).split()
+
+
+def fixture_path(key: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{key}.html")
+
+
+def element(selector: str, inner: str, extra: str = "") -> str:
+    """Render an element matching a simple 'tag.class' selector."""
+    tag, _, class_name = selector.partition(".")
+    return f'<{tag} class="{class_name}"{extra}>{inner}</{tag}>'
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def synthesize_page(key: str, config: dict, articles: int) -> str:
+    """Build a landing page whose markup matches the source's selectors."""
+    rng = random.Random(key)
+    today = datetime(2024, 12, 1)
+
+    items = []
+    for i in range(articles):
+        title = sentence(rng, rng.randint(5, 12))
+        body = " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(6))
+        date = (today - timedelta(days=i // 3)).strftime(config["date_format"])
+        url = f"{config['url'].rstrip('/')}/{key}-article-{i}"
+        inner = (
+            f'<a href="{url}"><img src="/img/{i}.jpg" alt=""></a>'
+            + element(config["title_selector"], f'<a href="{url}">{title}</a>')
+            + element(config["date_selector"], date)
+            + element(config["content_selector"], f"<p>{body}</p>")
+        )
+        items.append(element(config["article_selector"], inner))
+
+    # Surround the articles with navigation and sidebar markup like a real page
+    nav = "".join(f'<li><a href="/section/{w}">{w}</a></li>' for w in WORDS)
+    sidebar = "".join(
+        f'<div class="widget"><h4>{sentence(rng, 4)}</h4><p>{sentence(rng, 30)}</p></div>'
+        for _ in range(20)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{config['name']}</title>"
+        f"<script>{'var x = 1;' * 200}</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f'<main>{"".join(items)}</main><aside>{sidebar}</aside>'
+        f"<footer><ul>{nav}</ul></footer></body></html>"
+    )
+
+
+async def record_live() -> None:
+    async with AsyncFetcher() as fetcher:
+        for key, config in WEBSITE_CONFIGS.items():
+            try:
+                html = await fetcher.fetch_text(config["url"])
+            except Exception as e:
+                print(f"{key}: failed ({str(e)})")
+                continue
+            with open(fixture_path(key), "w", encoding="utf-8") as f:
+                f.write(html)
+            print(f"{key}: {len(html)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="Record real pages")
+    parser.add_argument("--articles", type=int, default=30)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    if args.live:
+        asyncio.run(record_live())
+        return
+
+    for key, config in WEBSITE_CONFIGS.items():
+        html = synthesize_page(key, config, args.articles)
+        with open(fixture_path(key), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"{key}: {len(html)} bytes")
+
+
+if __name__ == "__main__":
+    main()
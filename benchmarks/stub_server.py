@@ -0,0 +1,146 @@
+# benchmarks/stub_server.py
+"""Local HTTP server for offline benchmarks.
+
+Serves the recorded fixture pages under ``/sites/<key>`` and an
+OpenAI/Groq-compatible ``/openai/v1/chat/completions`` endpoint with
+configurable latency and 429 injection. Batch requests (numbered
+``<article id="N">`` blocks) get one JSON result per article, with a
+configurable share of results left out.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Optional
+
+from aiohttp import web
+
+from benchmarks.record_fixtures import FIXTURES_DIR
+
+BATCH_ITEM = re.compile(r'<article id="(\d+)">')
+
+
+class StubServer:
+    """Fixture and LLM stub server running on the current event loop."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        llm_latency: float = 0.2,
+        page_latency: float = 0.05,
+        rate_limit_ratio: float = 0.0,
+        retry_after: float = 0.5,
+        seed: int = 0,
+        batch_drop_ratio: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.llm_latency = llm_latency
+        self.page_latency = page_latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.batch_drop_ratio = batch_drop_ratio
+        self.rng = random.Random(seed)
+        self.llm_requests = 0
+        self.rate_limited = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def site_url(self, key: str) -> str:
+        return f"{self.base_url}/sites/{key}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/sites/{key}", self.handle_site)
+        app.router.add_post("/openai/v1/chat/completions", self.handle_completion)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve the port when an ephemeral one was requested
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_site(self, request: web.Request) -> web.Response:
+        path = os.path.join(FIXTURES_DIR, f"{request.match_info['key']}.html")
+        if not os.path.exists(path):
+            raise web.HTTPNotFound()
+        await asyncio.sleep(self.page_latency)
+        with open(path, "rb") as f:
+            body = f.read()
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    async def handle_completion(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.llm_requests += 1
+        if self.rng.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                status=429,
+                headers={"retry-after": str(self.retry_after)},
+            )
+
+        await asyncio.sleep(self.llm_latency)
+        prompt = payload["messages"][-1]["content"]
+        digest = hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8]
+        batch_ids = BATCH_ITEM.findall(prompt)
+        if batch_ids:
+            # Batch requests answer per numbered article, dropping some
+            content = json.dumps(
+                {
+                    "results": [
+                        {
+                            "id": article_id,
+                            "summary": f"Stub summary {digest}-{article_id}.",
+                            "keywords": ["ai", "benchmark", digest],
+                        }
+                        for article_id in batch_ids
+                        if self.rng.random() >= self.batch_drop_ratio
+                    ]
+                }
+            )
+        elif payload.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps(
+                {
+                    "summary": f"Stub summary {digest}.",
+                    "keywords": ["ai", "benchmark", digest],
+                }
+            )
+        else:
+            content = f"Stub summary {digest}."
+
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{digest}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
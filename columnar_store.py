@@ -0,0 +1,251 @@
+# columnar_store.py
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, List, Optional
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import STORAGE_SETTINGS
+from models import Article
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns stored in the Parquet files; source and date live in the partition path
+FILE_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("published_date", pa.timestamp("us")),
+        ("summary", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+        ("content", pa.string()),
+        ("processed_date", pa.timestamp("us")),
+        ("duplicate_of", pa.string()),
+    ]
+)
+TABLE_SCHEMA = pa.schema([("source", pa.string())] + list(FILE_SCHEMA))
+PARTITION_SCHEMA = pa.schema([("source", pa.string()), ("date", pa.date32())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+# Files written before a column was added read it as nulls
+DATASET_SCHEMA = pa.schema(list(FILE_SCHEMA) + list(PARTITION_SCHEMA))
+
+# Sort keys by display order; relevance keeps the order of a ranked search
+SORT_ORDERS = {
+    "Date": [("published_date", "descending")],
+    "Source": [("source", "ascending"), ("published_date", "descending")],
+    "Relevance": None,
+}
+
+
+class ColumnarArticleStore:
+    """Parquet archive of articles partitioned by source and publication date.
+
+    Each ``source=<name>/date=<YYYY-MM-DD>`` partition holds a single file that
+    is rewritten when new articles for it arrive, so history stays compact and
+    deduplicated by article id. Reads only touch the partitions and columns
+    they need; ``content`` is left out unless asked for.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or STORAGE_SETTINGS["archive_path"]
+        self.logger = logging.getLogger(__name__)
+
+    def _partition_dir(self, source: str, date: str) -> str:
+        return os.path.join(
+            self.root, f"source={quote(source, safe='')}", f"date={date}"
+        )
+
+    def append(self, articles: Iterable[Article]) -> None:
+        """Merge articles into their partitions, keeping the latest per id."""
+        rows = [article.model_dump(mode="python") for article in articles]
+        if not rows:
+            return
+
+        # Only writers need pandas; readers stay on Arrow
+        import pandas as pd
+
+        frame = pd.DataFrame(rows)
+        frame["url"] = frame["url"].astype(str)
+        frame["date"] = frame["published_date"].dt.strftime("%Y-%m-%d")
+
+        for (source, date), group in frame.groupby(["source", "date"]):
+            directory = self._partition_dir(source, date)
+            os.makedirs(directory, exist_ok=True)
+            existing = [
+                os.path.join(directory, name)
+                for name in os.listdir(directory)
+                if name.endswith(".parquet")
+            ]
+
+            table = pa.Table.from_pandas(
+                group[FILE_SCHEMA.names], schema=FILE_SCHEMA, preserve_index=False
+            )
+            if existing:
+                table = pa.concat_tables(
+                    [pq.read_table(path, schema=FILE_SCHEMA) for path in existing]
+                    + [table]
+                )
+                # Keep the most recently processed copy of each article
+                table = table.sort_by([("processed_date", "descending")])
+                ids = table["id"].to_pylist()
+                seen, keep = set(), []
+                for index, article_id in enumerate(ids):
+                    if article_id not in seen:
+                        seen.add(article_id)
+                        keep.append(index)
+                table = table.take(keep)
+
+            # Write the merged partition before removing the files it replaces
+            path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+            pq.write_table(table, path)
+            for old_path in existing:
+                os.remove(old_path)
+
+    @staticmethod
+    def filter_table(
+        table: pa.Table,
+        sources: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        keywords: Optional[List[str]] = None,
+        include_duplicates: bool = True,
+    ) -> pa.Table:
+        """Apply source, date and keyword predicates as vectorized Arrow kernels.
+
+        Keywords match case-insensitively; an article matches if any of its
+        keywords is one of ``keywords``. ``include_duplicates=False`` drops
+        near-duplicates of other articles.
+        """
+        mask = None
+
+        def combine(condition):
+            return condition if mask is None else pc.and_(mask, condition)
+
+        if sources is not None:
+            mask = combine(
+                pc.is_in(table["source"], value_set=pa.array(sources, pa.string()))
+            )
+        if date_from is not None:
+            mask = combine(
+                pc.greater_equal(table["published_date"], pa.scalar(date_from))
+            )
+        if date_to is not None:
+            mask = combine(pc.less_equal(table["published_date"], pa.scalar(date_to)))
+        if not include_duplicates:
+            mask = combine(pc.is_null(table["duplicate_of"]))
+        if mask is not None:
+            table = table.filter(mask)
+
+        if keywords and table.num_rows:
+            column = table["keywords"].combine_chunks()
+            matches = pc.is_in(
+                pc.utf8_lower(pc.list_flatten(column)),
+                value_set=pa.array([keyword.lower() for keyword in keywords]),
+            )
+            rows = pc.unique(pc.filter(pc.list_parent_indices(column), matches))
+            table = table.take(rows)
+
+        return table
+
+    @staticmethod
+    def take_ids(table: pa.Table, ids: List[str]) -> pa.Table:
+        """The rows with the given ids, in that order; unknown ids are skipped."""
+        positions = pc.index_in(
+            pa.array(ids, pa.string()), value_set=table["id"].combine_chunks()
+        )
+        return table.take(pc.drop_null(positions))
+
+    @staticmethod
+    def sort_table(table: pa.Table, order: str) -> pa.Table:
+        """Sort rows by one of ``SORT_ORDERS``; "Relevance" keeps them as they are."""
+        keys = SORT_ORDERS[order]
+        return table.sort_by(keys) if keys else table
+
+    def load_table(
+        self,
+        sources: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        keywords: Optional[List[str]] = None,
+        include_content: bool = False,
+    ) -> pa.Table:
+        """Load matching articles as an Arrow table, newest first.
+
+        Source and date predicates prune whole partitions before any file
+        is read.
+        """
+        columns = [
+            name
+            for name in ["source"] + FILE_SCHEMA.names
+            if include_content or name != "content"
+        ]
+        if not os.path.isdir(self.root):
+            return TABLE_SCHEMA.empty_table().select(columns)
+
+        dataset = ds.dataset(
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            schema=DATASET_SCHEMA,
+        )
+        expression = None
+
+        def combine(condition):
+            return condition if expression is None else expression & condition
+
+        if sources is not None:
+            expression = combine(
+                ds.field("source").isin(pa.array(sources, pa.string()))
+            )
+        if date_from is not None:
+            expression = combine(ds.field("date") >= date_from.date())
+        if date_to is not None:
+            expression = combine(ds.field("date") <= date_to.date())
+
+        table = dataset.to_table(columns=columns, filter=expression)
+        table = self.filter_table(table, None, date_from, date_to, keywords)
+        return table.sort_by([("published_date", "descending")])
+
+    def load(self, **filters) -> "pd.DataFrame":
+        """Load matching articles as a DataFrame; see ``load_table``."""
+        return self.load_table(**filters).to_pandas()
+
+    @staticmethod
+    def from_articles(
+        articles: Iterable[Article], include_content: bool = False
+    ) -> pa.Table:
+        """Build an in-memory table from Article models, newest first."""
+        rows = [article.model_dump(mode="python") for article in articles]
+        for row in rows:
+            row["url"] = str(row["url"])
+        table = pa.Table.from_pylist(rows, schema=TABLE_SCHEMA)
+        if not include_content:
+            table = table.drop_columns(["content"])
+        return table.sort_by([("published_date", "descending")])
+
+    @staticmethod
+    def to_articles(table: pa.Table) -> List[Article]:
+        """Materialize Article models for the given rows only."""
+        return [
+            Article(
+                id=row["id"],
+                title=row["title"],
+                url=row["url"],
+                source=row["source"],
+                published_date=row["published_date"],
+                summary=row["summary"],
+                keywords=row["keywords"] or [],
+                content=row.get("content") or "",
+                processed_date=row["processed_date"],
+                duplicate_of=row.get("duplicate_of"),
+            )
+            for row in table.to_pylist()
+        ]
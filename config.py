@@ -6,10 +6,9 @@ from typing import Dict
 # Load environment variables from .env file
 load_dotenv()
 
-# API Configuration
+# API Configuration; validated by models.Settings when an LLM client is
+# created, so modules that only read stored articles import without it
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not found in environment variables")
 
 # Website configurations
 WEBSITE_CONFIGS = {
@@ -110,6 +109,13 @@ SCRAPING_SETTINGS = {
     "request_timeout": 30,  # seconds
     "max_retries": 3,
     "retry_delay": 5,  # seconds
+    "max_concurrent_requests": 10,  # across all hosts
+    "max_requests_per_host": 2,
+    # "lxml" parses only article subtrees with compiled selectors;
+    # "html.parser" builds the full page tree with the stdlib parser
+    "parser": "lxml",
+    # Parse pages in this many worker processes; 0 parses on the event loop
+    "parse_workers": 0,
     "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
 }
 
@@ -117,11 +123,124 @@ SCRAPING_SETTINGS = {
 CACHE_SETTINGS = {
     "cache_duration": 3600,  # 1 hour in seconds
     "max_cache_items": 1000,
+    "http_cache_path": ".cache/http_cache.sqlite3",
+    "llm_cache_path": ".cache/llm_cache.sqlite3",
+    "llm_cache_duration": 30 * 24 * 3600,  # 30 days in seconds
+    "llm_max_cache_items": 50000,
+    "articles_ttl": 60,  # seconds the UI shares one loaded article table
+    "article_tables": 16,  # filter combinations kept loaded at once
+}
+
+# Persistent storage settings
+STORAGE_SETTINGS = {
+    "article_db_path": "data/articles.sqlite3",
+    # Parquet history partitioned by source and date (see columnar_store.py)
+    "archive_path": "data/archive",
+}
+
+# Streaming pipeline settings
+PIPELINE_SETTINGS = {
+    "queue_size": 50,  # articles buffered between stages
+    "summarize_workers": 8,
+    # In batch mode a worker collects up to batch_max_articles articles,
+    # waiting at most this long for more to arrive
+    "batch_linger": 0.2,  # seconds
+}
+
+# Near-duplicate detection before summarization (see dedup.py)
+DEDUP_SETTINGS = {
+    "enabled": True,
+    "shingle_size": 2,  # words per shingle
+    "num_perm": 128,  # MinHash signature length
+    "bands": 32,  # LSH bands; 128 / 32 = 4 values per band
+    # Estimated Jaccard similarity of the shingle sets above which two
+    # articles are duplicates; a copy with an added byline, a trimmed ending
+    # or 10% of its words changed typically scores 0.7-0.9
+    "threshold": 0.5,
+    "min_words": 20,  # shorter texts are never treated as duplicates
+}
+
+# Adaptive per-source refresh schedule (see refresh_scheduler.py)
+REFRESH_SETTINGS = {
+    "enabled": True,
+    "state_path": "data/refresh_state.json",
+    "min_interval": 900,  # seconds; how often the busiest sources are polled
+    "max_interval": 86400,  # seconds; quiet sources are still polled daily
+    # Aim for this many new articles per poll
+    "target_new_per_poll": 0.5,
+    # Weight of older observations in the publish rate halves this often
+    "rate_half_life": 3 * 86400,  # seconds
+    # Circuit breaker: after SCRAPING_SETTINGS["max_retries"] failures in a
+    # row a source is paused for this long, doubling on every further failure
+    "breaker_cooldown": 1800,  # seconds
+    "known_ids": 500,  # article ids remembered per source
+}
+
+# Local embeddings for semantic search and related articles (see embeddings.py)
+EMBEDDING_SETTINGS = {
+    "enabled": True,
+    # "hashing" needs no download; or a sentence-transformers model name,
+    # e.g. "all-MiniLM-L6-v2", if that package is installed
+    "model": "hashing",
+    "dim": 384,  # dimensions of the hashing embedder
+    "path": "data/embeddings",
+    "batch_size": 256,  # articles embedded per call
+    # Above this many articles queries probe an inverted-file index
+    "ann_threshold": 100000,
+    "ann_lists": None,  # k-means cells; None uses sqrt(articles)
+    "ann_probes": 8,  # cells scanned per query
+    "min_score": 0.1,  # cosine similarity below which matches are dropped
+}
+
+# Streamlit article list settings
+UI_SETTINGS = {
+    "page_sizes": [10, 20, 50],  # articles per page to choose from
+    "search_limit": 500,  # ranked search results that can be paged through
+}
+
+# Background ingestion settings (see ingest.py)
+INGEST_SETTINGS = {
+    "interval": "15m",
+    # When False the Streamlit apps only read the store written by ingest.py
+    "ui_ingest": False,
+}
+
+# Metrics endpoint of the ingest process (see metrics.py)
+METRICS_SETTINGS = {
+    "port": 9100,  # 0 disables the endpoint
+    # Read by the Streamlit diagnostics panel when articles are ingested there
+    "ingest_url": "http://localhost:9100/metrics",
+}
+
+# LLM settings
+LLM_SETTINGS = {
+    "model": "mixtral-8x7b-32768",
+    "temperature": 0.3,
+    # Request summary and keywords together as JSON in one call per article
+    "combined_mode": True,
+    # Pack several articles into one JSON request (AIProcessor.process_articles)
+    "batch_mode": True,
+    "batch_token_budget": 3000,  # prompt tokens of article text per request
+    "batch_max_articles": 20,
+    "batch_output_tokens": 200,  # completion tokens reserved per article
+    # Scheduler limits; match these to the provider's rate limits
+    "max_in_flight": 8,
+    "requests_per_minute": 30,
+    "tokens_per_minute": 5000,
+    "max_retries": 6,
+    "retry_base_delay": 1,  # seconds
+    "retry_max_delay": 60,  # seconds
 }
 
 # Article processing settings
 ARTICLE_SETTINGS = {
     "max_summary_length": 500,  # characters
-    "min_article_length": 100,  # characters
+    "min_article_length": 100,  # characters; shorter texts skip the LLM
     "max_keywords": 10,
+    # Token budget for the article text sent to the LLM
+    "max_content_tokens": 3000,
+    # Longer texts are summarized in chunks first (map-reduce)
+    "map_reduce_threshold": 6000,  # tokens
+    "chunk_tokens": 2000,
+    "max_chunks": 6,
 }
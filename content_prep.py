@@ -0,0 +1,77 @@
+# content_prep.py
+import re
+from typing import List
+
+from llm_scheduler import estimate_tokens
+
+# Lines that are page furniture rather than article text
+BOILERPLATE_PATTERNS = re.compile(
+    r"^(advertisement|sponsored( content)?|share( this( article| story)?)?|"
+    r"related( articles| stories)?:?|all rights reserved\.?)$",
+    re.IGNORECASE,
+)
+
+# Furniture that only announces itself by its first words; these only apply
+# to short lines so that article paragraphs starting the same way are kept
+FOOTER_PATTERNS = re.compile(
+    r"^((read|see) (more|also|next)\b.*|"
+    r"(subscribe|sign up)\b.*(newsletter|updates|inbox).*|"
+    r"follow us\b.*|click here\b.*|"
+    r"(this|our) (site|website) uses cookies\b.*|.*accept (all )?cookies\b.*|"
+    r"©.*|(\(c\)|copyright)\s*(©|\(c\))?\s*"
+    r"((19|20)\d{2}\b|.*all rights reserved).*|"
+    r"tags?:.*|filed under:?.*|image( credit)?:.*|photo:.*)$",
+    re.IGNORECASE,
+)
+FOOTER_MAX_WORDS = 12
+
+# Summary of an article left without text by cleaning; unlike an empty one
+# it does not mark a failed AI pass, so the article is not processed again
+NO_CONTENT_SUMMARY = "No article text to summarize"
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+CHARS_PER_TOKEN = 4
+
+
+def clean_content(text: str) -> str:
+    """Drop boilerplate and repeated lines and normalize whitespace."""
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line or BOILERPLATE_PATTERNS.match(line) or line in seen:
+            continue
+        if len(line.split()) <= FOOTER_MAX_WORDS and FOOTER_PATTERNS.match(line):
+            continue
+        seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to about ``max_tokens``, preferring a sentence boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[: max_tokens * CHARS_PER_TOKEN]
+    boundary = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n"))
+    if boundary > len(cut) // 2:
+        return cut[: boundary + 1].rstrip()
+    return cut.rsplit(" ", 1)[0]
+
+
+def split_into_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """Split a text into chunks of about ``chunk_tokens`` along sentences."""
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in text.split("\n"):
+        for sentence in SENTENCE_END.split(paragraph):
+            # A single overlong sentence is cut on its own
+            sentence = truncate_to_tokens(sentence, chunk_tokens)
+            tokens = estimate_tokens(sentence)
+            if current and current_tokens + tokens > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
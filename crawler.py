@@ -0,0 +1,346 @@
+# crawler.py
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from fetcher import AsyncFetcher
+from metrics import CRAWL_FETCHES, FETCH_SECONDS, FETCHES, PARSE_SECONDS
+from models import FetchResponse, WebsiteConfig
+from parsing import ArticleRecord, find_next_page, parse_datetime
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+    import xml.etree.ElementTree as ElementTree
+
+if TYPE_CHECKING:
+    from scraper import NewsScraperAgent
+
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+class SitemapEntry(NamedTuple):
+    """One ``<url>`` or ``<sitemap>`` element of a sitemap."""
+
+    url: str
+    published_date: Optional[datetime]
+    title: Optional[str]
+
+
+def _parse_xml(text: str):
+    if etree is not None:
+        # Feeds are often slightly malformed; entities and network access
+        # stay disabled for untrusted documents
+        parser = etree.XMLParser(
+            encoding="utf-8", recover=True, resolve_entities=False, no_network=True
+        )
+        root = etree.fromstring(text.encode("utf-8"), parser)
+        if root is None:
+            raise ValueError("Document is not XML")
+        return root
+    return ElementTree.fromstring(XML_DECLARATION.sub("", text))
+
+
+def _local_name(element) -> str:
+    tag = element.tag if isinstance(element.tag, str) else ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _children(element, name: str) -> list:
+    return [child for child in element if _local_name(child) == name]
+
+
+def _child_text(element, *names: str) -> Optional[str]:
+    """Text of the first child with one of the given local names."""
+    for name in names:
+        for child in _children(element, name):
+            if child.text and child.text.strip():
+                return child.text.strip()
+    return None
+
+
+def _html_to_text(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").get_text("\n", strip=True)
+
+
+def parse_feed(text: str, base_url: str) -> List[ArticleRecord]:
+    """Extract article records from an RSS 2.0 or Atom feed.
+
+    The content is the entry's full text when the feed carries it
+    (``content:encoded`` or Atom ``content``), else its description.
+    Entries without a date get ``published_date=None``.
+    """
+    root = _parse_xml(text)
+    records = []
+    for item in root.iter():
+        name = _local_name(item)
+        if name == "item":
+            link = _child_text(item, "link") or _child_text(item, "guid")
+            date = _child_text(item, "pubDate", "date")
+            body = _child_text(item, "encoded", "description")
+        elif name == "entry":
+            links = _children(item, "link")
+            alternate = [
+                child for child in links if child.get("rel", "alternate") == "alternate"
+            ]
+            link = next((child.get("href") for child in alternate or links), None)
+            date = _child_text(item, "published", "updated")
+            body = _child_text(item, "content", "summary")
+        else:
+            continue
+
+        title = _child_text(item, "title")
+        if not title or not link:
+            continue
+        records.append(
+            ArticleRecord(
+                title=_html_to_text(title),
+                content=_html_to_text(body) if body else "",
+                published_date=parse_datetime(date) if date else None,
+                url=urljoin(base_url, link),
+            )
+        )
+    return records
+
+
+def parse_sitemap(text: str) -> Tuple[List[SitemapEntry], List[SitemapEntry]]:
+    """Split a sitemap into article URLs and child sitemaps (for an index).
+
+    Google News sitemap titles and publication dates are used when present.
+    """
+    root = _parse_xml(text)
+    articles, sitemaps = [], []
+    for element in root:
+        location = _child_text(element, "loc")
+        if not location:
+            continue
+        news = next(iter(_children(element, "news")), None)
+        date = (news is not None and _child_text(news, "publication_date")) or (
+            _child_text(element, "lastmod")
+        )
+        entry = SitemapEntry(
+            url=location,
+            published_date=parse_datetime(date) if date else None,
+            title=_child_text(news, "title") if news is not None else None,
+        )
+        if _local_name(element) == "sitemap":
+            sitemaps.append(entry)
+        elif _local_name(element) == "url":
+            articles.append(entry)
+    return articles, sitemaps
+
+
+def _newest_first(entries: List[SitemapEntry]) -> List[SitemapEntry]:
+    return sorted(
+        entries, key=lambda entry: entry.published_date or datetime.min, reverse=True
+    )
+
+
+class Crawler:
+    """Collects the article records of one website for a scrape.
+
+    Articles are discovered from the website's RSS/Atom feed or sitemap
+    when it has one, which costs one request instead of parsing HTML.
+    Without one, or when it fails, the landing page is parsed and up to
+    ``max_pages - 1`` further listing pages are followed. With
+    ``fetch_details``, and for sitemap entries that only give a URL, each
+    article's own page is fetched concurrently for its full content; the
+    fetcher's per-host connection limit keeps this polite. At most
+    ``max_articles`` articles are collected per scrape.
+    """
+
+    def __init__(self, scraper: "NewsScraperAgent", fetcher: AsyncFetcher):
+        self.scraper = scraper
+        self.fetcher = fetcher
+        self.logger = logging.getLogger(__name__)
+
+    async def crawl(
+        self, config: WebsiteConfig
+    ) -> Tuple[List[ArticleRecord], List[str]]:
+        """Return the website's article records and per-article errors.
+
+        Raises if the landing page is needed and cannot be fetched.
+        """
+        records: List[ArticleRecord] = []
+        if config.feed_url is not None:
+            records = await self._discover(config, "feed", self._feed_records)
+        if not records and config.sitemap_url is not None:
+            records = await self._discover(config, "sitemap", self._sitemap_records)
+
+        errors: List[str] = []
+        if not records:
+            records, errors = await self._listing_records(config)
+        records = records[: config.max_articles]
+
+        if any(self._needs_detail(config, record) for record in records):
+            records = await self._complete(config, records, errors)
+        return records, errors
+
+    @staticmethod
+    def _needs_detail(config: WebsiteConfig, record: ArticleRecord) -> bool:
+        return (
+            config.fetch_details
+            or not record.title
+            or not record.content
+            or record.published_date is None
+        )
+
+    async def _fetch(self, url: str, config: WebsiteConfig, kind: str) -> FetchResponse:
+        try:
+            response = await self.fetcher.fetch(url)
+        except Exception:
+            CRAWL_FETCHES.inc(source=config.name, kind=kind, status="error")
+            raise
+        CRAWL_FETCHES.inc(source=config.name, kind=kind, status=str(response.status))
+        return response
+
+    async def _discover(
+        self, config: WebsiteConfig, kind: str, discover
+    ) -> List[ArticleRecord]:
+        try:
+            return await discover(config)
+        except Exception as e:
+            self.logger.warning(
+                f"Error reading the {kind} of {config.name}, "
+                f"falling back to its pages: {str(e)}"
+            )
+            return []
+
+    async def _feed_records(self, config: WebsiteConfig) -> List[ArticleRecord]:
+        url = str(config.feed_url)
+        response = await self._fetch(url, config, "feed")
+        return parse_feed(response.text, url)
+
+    async def _sitemap_records(self, config: WebsiteConfig) -> List[ArticleRecord]:
+        url = str(config.sitemap_url)
+        entries, sitemaps = parse_sitemap(
+            (await self._fetch(url, config, "sitemap")).text
+        )
+        if sitemaps:
+            # A sitemap index: read the most recently changed child sitemaps
+            children = _newest_first(sitemaps)[: config.max_pages]
+            responses = await asyncio.gather(
+                *(self._fetch(child.url, config, "sitemap") for child in children),
+                return_exceptions=True,
+            )
+            for child, response in zip(children, responses):
+                if isinstance(response, Exception):
+                    self.logger.warning(
+                        f"Error reading sitemap {child.url}: {response}"
+                    )
+                    continue
+                entries.extend(parse_sitemap(response.text)[0])
+
+        if config.sitemap_url_pattern:
+            pattern = re.compile(config.sitemap_url_pattern)
+            entries = [entry for entry in entries if pattern.search(entry.url)]
+        return [
+            ArticleRecord(
+                title=entry.title or "",
+                content="",
+                published_date=entry.published_date,
+                url=urljoin(url, entry.url),
+            )
+            for entry in _newest_first(entries)[: config.max_articles]
+        ]
+
+    async def _listing_page(
+        self, url: str, config: WebsiteConfig
+    ) -> Tuple[str, List[ArticleRecord], List[str]]:
+        try:
+            with FETCH_SECONDS.time(source=config.name):
+                response = await self.fetcher.fetch(url)
+        except Exception:
+            FETCHES.inc(source=config.name, status="error")
+            raise
+        FETCHES.inc(source=config.name, status=str(response.status))
+
+        parsed_pages = self.scraper._parsed_pages
+        if response.not_modified and url in parsed_pages:
+            return response.text, list(parsed_pages[url]), []
+        with PARSE_SECONDS.time(source=config.name, kind="listing"):
+            records, errors = await self.scraper.extract_records_async(
+                response.text, config
+            )
+        records = [record._replace(url=urljoin(url, record.url)) for record in records]
+        parsed_pages[url] = records
+        return response.text, records, errors
+
+    async def _listing_records(
+        self, config: WebsiteConfig
+    ) -> Tuple[List[ArticleRecord], List[str]]:
+        url = str(config.url)
+        visited = {url}
+        records, errors = [], []
+        for page in range(config.max_pages):
+            try:
+                html, page_records, page_errors = await self._listing_page(url, config)
+            except Exception as e:
+                if page == 0:
+                    raise
+                self.logger.warning(f"Error fetching page {url} of {config.name}: {e}")
+                break
+            records.extend(page_records)
+            errors.extend(page_errors)
+            if page + 1 == config.max_pages or len(records) >= config.max_articles:
+                break
+
+            next_url = find_next_page(html, url, config.next_page_selector)
+            if next_url is None or next_url in visited:
+                break
+            visited.add(next_url)
+            url = next_url
+        return records, errors
+
+    async def _complete(
+        self, config: WebsiteConfig, records: List[ArticleRecord], errors: List[str]
+    ) -> List[ArticleRecord]:
+        """Fill in content, and a missing title or date, from article pages.
+
+        Articles that are already stored take these from the store instead,
+        so a poll only fetches the pages of new articles. Records that still
+        lack a title or date are reported as errors.
+        """
+        stored = self.scraper.stored_articles(
+            [record.url for record in records if self._needs_detail(config, record)]
+        )
+
+        async def complete(record: ArticleRecord) -> ArticleRecord:
+            if not self._needs_detail(config, record):
+                return record
+            article = stored.get(record.url)
+            if article is not None:
+                return record._replace(
+                    title=record.title or article.title,
+                    content=article.content or record.content,
+                    published_date=record.published_date or article.published_date,
+                )
+            try:
+                response = await self._fetch(record.url, config, "detail")
+                with PARSE_SECONDS.time(source=config.name, kind="detail"):
+                    detail = await self.scraper.extract_detail_async(
+                        response.text, config
+                    )
+            except Exception as e:
+                # Keep what discovery found, e.g. the teaser from the listing
+                self.logger.warning(f"Error fetching article {record.url}: {e}")
+                return record
+            return record._replace(
+                title=record.title or detail.title or "",
+                content=detail.content or record.content,
+                published_date=record.published_date or detail.published_date,
+            )
+
+        completed = []
+        for record in await asyncio.gather(*(complete(r) for r in records)):
+            if record.title and record.published_date is not None:
+                completed.append(record)
+            else:
+                errors.append(f"No title or date found for {record.url}")
+        return completed
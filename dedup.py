@@ -0,0 +1,186 @@
+# dedup.py
+import functools
+import hashlib
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import DEDUP_SETTINGS
+from models import Article
+
+if TYPE_CHECKING:
+    from article_store import ArticleStore
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fixed hash parameters, so signatures stay comparable across runs."""
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text: str, shingle_size: Optional[int] = None) -> Set[str]:
+    size = shingle_size or DEDUP_SETTINGS["shingle_size"]
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return {
+        " ".join(tokens[start : start + size])
+        for start in range(max(1, len(tokens) - size + 1))
+    }
+
+
+def minhash(text: str, num_perm: Optional[int] = None) -> np.ndarray:
+    """MinHash signature of a text's word shingles.
+
+    The share of positions where two signatures agree estimates the Jaccard
+    similarity of the texts' shingle sets. Unlike a SimHash of the same
+    shingles, that estimate degrades gracefully with edits, so a reworded
+    headline, an added byline or a trimmed paragraph still match.
+    """
+    num_perm = num_perm or DEDUP_SETTINGS["num_perm"]
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(),
+                "little",
+            )
+            for shingle in shingles(text) or {""}
+        ],
+        dtype=np.uint64,
+    )
+    a, b = _permutations(num_perm)
+    # Both factors are below 2**32, so the products fit in 64 bits
+    permuted = ((hashes[:, None] * a + b) % MERSENNE_PRIME) & MAX_HASH
+    return permuted.min(axis=0).astype("<u4")
+
+
+def fingerprint(text: str, min_words: Optional[int] = None) -> Optional[np.ndarray]:
+    """MinHash of an article text, or None if it is too short to compare."""
+    min_words = DEDUP_SETTINGS["min_words"] if min_words is None else min_words
+    if len(TOKEN_PATTERN.findall(text)) < min_words:
+        return None
+    return minhash(text)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(a == b))
+
+
+class DuplicateIndex:
+    """LSH index over MinHash signatures.
+
+    Signatures are split into ``bands`` bands; texts that agree on every
+    value of any band become candidates, which for the default 32 bands of
+    4 values finds pairs above about 0.42 Jaccard similarity. Candidates are
+    then checked against ``threshold``, so a lookup only compares the
+    signatures sharing a band bucket instead of scanning the whole history.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, bands: Optional[int] = None):
+        self.threshold = DEDUP_SETTINGS["threshold"] if threshold is None else threshold
+        self.bands = bands or DEDUP_SETTINGS["bands"]
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band, values in enumerate(np.array_split(signature, self.bands)):
+            yield band, values.tobytes()
+
+    def add(self, article_id: str, signature: np.ndarray) -> None:
+        previous = self._signatures.get(article_id)
+        if previous is not None and np.array_equal(previous, signature):
+            return
+        self._signatures[article_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets[key].append(article_id)
+
+    def query(self, signature: np.ndarray) -> Optional[str]:
+        """Return the id of the most similar indexed text above the threshold."""
+        best_id, best_similarity = None, self.threshold
+        seen = set()
+        for key in self._band_keys(signature):
+            for article_id in self._buckets.get(key, ()):
+                if article_id in seen:
+                    continue
+                seen.add(article_id)
+                score = similarity(signature, self._signatures[article_id])
+                if score >= best_similarity:
+                    best_id, best_similarity = article_id, score
+        return best_id
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+class Deduplicator:
+    """Assigns each scraped article to a near-duplicate cluster.
+
+    The first article seen with a given content becomes the cluster's
+    canonical article; later near-duplicates point at it and reuse its
+    summary instead of being sent to the LLM. With a store, the index is
+    seeded from the fingerprints of previously stored articles.
+    """
+
+    def __init__(
+        self,
+        store: Optional["ArticleStore"] = None,
+        threshold: Optional[float] = None,
+        min_words: Optional[int] = None,
+    ):
+        self.store = store
+        self.index = DuplicateIndex(threshold)
+        self.min_words = DEDUP_SETTINGS["min_words"] if min_words is None else min_words
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._loaded = store is None
+
+    def _load_history(self) -> None:
+        try:
+            for article_id, signature in self.store.fingerprints():
+                self.index.add(article_id, signature)
+            self.logger.info(f"Loaded {len(self.index)} article fingerprints")
+        except Exception as e:
+            self.logger.error(f"Error loading article fingerprints: {str(e)}")
+        self._loaded = True
+
+    def find_duplicate(self, article: Article) -> Optional[str]:
+        """Return the canonical id this article duplicates, or None.
+
+        Articles that are not duplicates become canonical for later lookups.
+        Texts shorter than ``min_words`` are never treated as duplicates.
+        """
+        value = fingerprint(article.content, self.min_words)
+        if value is None:
+            return None
+
+        with self._lock:
+            if not self._loaded:
+                self._load_history()
+            canonical_id = self.index.query(value)
+            if canonical_id is None or canonical_id == article.id:
+                self.index.add(article.id, value)
+                return None
+            return canonical_id
+
+
+def copy_summary(duplicate: Article, canonical: Article) -> Article:
+    """Give a duplicate the canonical article's summary and keywords."""
+    return duplicate.model_copy(
+        update={
+            "summary": canonical.summary,
+            "keywords": list(canonical.keywords),
+            "duplicate_of": canonical.id,
+        }
+    )
@@ -0,0 +1,160 @@
+# diagnostics.py
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+import streamlit as st
+
+from config import INGEST_SETTINGS, METRICS_SETTINGS
+from metrics import REGISTRY, Sample, histogram_quantile, parse_samples
+
+logger = logging.getLogger(__name__)
+
+
+def load_samples() -> Tuple[List[Sample], str]:
+    """Metrics of the process doing the ingestion, and where they came from.
+
+    When ingest.py does the work its endpoint is read; the app's own
+    registry is used when it ingests itself or the endpoint is unreachable.
+    """
+    if not INGEST_SETTINGS["ui_ingest"] and METRICS_SETTINGS["ingest_url"]:
+        try:
+            response = requests.get(METRICS_SETTINGS["ingest_url"], timeout=2)
+            response.raise_for_status()
+            return parse_samples(response.text), METRICS_SETTINGS["ingest_url"]
+        except Exception as e:
+            logger.warning(f"Error reading ingest metrics: {str(e)}")
+    return REGISTRY.samples(), "this app"
+
+
+def _values(
+    samples: List[Sample], name: str, label: Optional[str] = None
+) -> Dict[str, float]:
+    """Sum a metric's samples, grouped by one label."""
+    values: Dict[str, float] = defaultdict(float)
+    for sample in samples:
+        if sample.name == name:
+            values[sample.labels.get(label, "") if label else ""] += sample.value
+    return values
+
+
+def _quantiles(
+    samples: List[Sample], name: str, label: Optional[str], quantile: float
+) -> Dict[str, float]:
+    buckets: Dict[str, Dict[float, float]] = defaultdict(lambda: defaultdict(float))
+    for sample in samples:
+        if sample.name == f"{name}_bucket":
+            group = sample.labels.get(label, "") if label else ""
+            buckets[group][float(sample.labels["le"])] += sample.value
+    return {
+        group: histogram_quantile(quantile, list(bounds.items()))
+        for group, bounds in buckets.items()
+    }
+
+
+def _mean(samples: List[Sample], name: str, label: Optional[str]) -> Dict[str, float]:
+    totals = _values(samples, f"{name}_sum", label)
+    counts = _values(samples, f"{name}_count", label)
+    return {
+        group: totals[group] / count if count else math.nan
+        for group, count in counts.items()
+    }
+
+
+def source_table(samples: List[Sample]) -> pd.DataFrame:
+    """Per-source fetch/parse latency and extraction counts."""
+    fetches: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for sample in samples:
+        if sample.name == "scraper_fetches_total":
+            fetches[sample.labels["source"]][sample.labels["status"]] = sample.value
+
+    fetch_p50 = _quantiles(samples, "scraper_fetch_seconds", "source", 0.5)
+    fetch_p95 = _quantiles(samples, "scraper_fetch_seconds", "source", 0.95)
+    parse_means = {
+        kind: _mean(
+            [s for s in samples if s.labels.get("kind") == kind],
+            "scraper_parse_seconds",
+            "source",
+        )
+        for kind in ("listing", "detail")
+    }
+    parsed = _values(samples, "scraper_articles_parsed_total", "source")
+    failed = _values(samples, "scraper_articles_failed_total", "source")
+
+    rows = []
+    for source in sorted(set(fetches) | set(parsed)):
+        statuses = fetches.get(source, {})
+        rows.append(
+            {
+                "source": source,
+                "fetches": sum(statuses.values()),
+                "errors": statuses.get("error", 0),
+                "not modified": statuses.get("304", 0),
+                "fetch p50 (s)": fetch_p50.get(source, math.nan),
+                "fetch p95 (s)": fetch_p95.get(source, math.nan),
+                "parse mean (s)": parse_means["listing"].get(source, math.nan),
+                "detail parse mean (s)": parse_means["detail"].get(source, math.nan),
+                "parsed": parsed.get(source, 0),
+                "failed": failed.get(source, 0),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def llm_summary(samples: List[Sample]) -> Dict[str, float]:
+    requests_by_outcome = _values(samples, "llm_request_seconds_count", "outcome")
+    tokens = _values(samples, "llm_tokens_total", "direction")
+    return {
+        "requests": sum(requests_by_outcome.values()),
+        "failed attempts": requests_by_outcome.get("error", 0),
+        "retries": sum(_values(samples, "llm_retries_total", "error").values()),
+        "latency p50 (s)": _quantiles(samples, "llm_request_seconds", None, 0.5).get(
+            "", math.nan
+        ),
+        "latency p95 (s)": _quantiles(samples, "llm_request_seconds", None, 0.95).get(
+            "", math.nan
+        ),
+        "wait mean (s)": _mean(samples, "llm_wait_seconds", None).get("", math.nan),
+        "tokens in": tokens.get("in", 0),
+        "tokens out": tokens.get("out", 0),
+    }
+
+
+def cache_table(samples: List[Sample]) -> pd.DataFrame:
+    lookups: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for sample in samples:
+        if sample.name == "cache_lookups_total":
+            lookups[sample.labels["cache"]][sample.labels["result"]] = sample.value
+    rows = []
+    for cache, results in sorted(lookups.items()):
+        total = sum(results.values())
+        rows.append(
+            {
+                "cache": cache,
+                "lookups": total,
+                "hit rate": results.get("hit", 0) / total if total else math.nan,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def render_diagnostics(container=st.sidebar) -> None:
+    """Render fetch, parse, LLM and cache metrics in an expander."""
+    with container.expander("Diagnostics", expanded=True):
+        samples, origin = load_samples()
+        st.caption(f"Metrics from {origin}")
+        if not samples:
+            st.write("No metrics recorded yet.")
+            return
+
+        st.write("Sources")
+        st.dataframe(source_table(samples), hide_index=True)
+        st.write("LLM")
+        st.dataframe(
+            pd.DataFrame([llm_summary(samples)]).T.rename(columns={0: "value"})
+        )
+        st.write("Caches")
+        st.dataframe(cache_table(samples), hide_index=True)
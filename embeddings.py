@@ -0,0 +1,511 @@
+# embeddings.py
+"""Local article embeddings and a memory-mapped vector index.
+
+Articles are embedded once at ingest time (title, summary and keywords) and
+appended to a float32 matrix on disk that readers memory-map, so the UI
+never recomputes them. Queries are answered with batched dot products over
+the unit-length rows; above ``ann_threshold`` rows an inverted-file index
+limits each query to the closest k-means cells.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory file locks on Windows
+    fcntl = None
+
+from config import EMBEDDING_SETTINGS
+from models import Article
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.-]*[a-z0-9+#]|[a-z0-9]")
+
+# Frequent words carry no topic; hashing has no IDF to down-weight them
+STOPWORDS = frozenset(
+    """a about after all also an and any are as at be been but by can could did
+    do does for from had has have he her his how if in into is it its just more
+    most new no not of on one or our out over said says she so some than that
+    the their them then there these they this those to up us was we were what
+    when which who will with would you your""".split()
+)
+
+# Rows scored per dot product; bounds the memory of a scan over the memmap
+SCAN_CHUNK_ROWS = 65536
+
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word pairs into a fixed-size vector.
+
+    Needs no model download or GPU: texts that share vocabulary end up
+    close, which is enough for topical search and related articles.
+    Term counts are damped with ``log(1 + tf)`` and vectors are L2-normalized.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or EMBEDDING_SETTINGS["dim"]
+
+    def _features(self, text: str) -> List[str]:
+        words = [
+            word
+            for word in TOKEN_PATTERN.findall(text.lower())
+            if word not in STOPWORDS
+        ]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            hashes = np.array(
+                [
+                    hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                    for feature in features
+                ],
+                dtype="S8",
+            ).view("<u8")
+            buckets = (hashes % np.uint64(self.dim)).astype(np.int64)
+            # The top bit picks the sign so colliding features tend to cancel
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+            counts = np.zeros(self.dim)
+            np.add.at(counts, buckets, signs)
+            vectors[row] = np.sign(counts) * np.log1p(np.abs(counts))
+        return normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model, run on the CPU."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=64, convert_to_numpy=True, show_progress_bar=False
+        )
+        return normalize(vectors.astype(np.float32))
+
+
+def create_embedder(model: Optional[str] = None):
+    """The configured embedder; falls back to hashing if the model can't load."""
+    model = model or EMBEDDING_SETTINGS["model"]
+    if model == HashingEmbedder.name:
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(model)
+    except Exception as e:
+        logger.warning(f"Error loading embedding model {model}, using hashing: {e}")
+        return HashingEmbedder()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def article_text(article: Article) -> str:
+    """The text an article is embedded from; the body is represented by its summary."""
+    return "\n".join([article.title, article.summary, ", ".join(article.keywords)])
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the ``k`` highest scores in each row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1)
+    return np.take_along_axis(best, order, axis=1)
+
+
+class IVFIndex:
+    """Inverted-file index over unit vectors.
+
+    Rows are assigned to ``lists`` k-means cells; a query is scored only
+    against the rows of its ``probes`` closest cells, trading a little
+    recall for a scan of roughly ``probes / lists`` of the matrix.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        lists: int,
+        probes: int,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.size = len(vectors)
+        self.probes = probes
+        rng = np.random.default_rng(seed)
+        lists = max(1, min(lists, self.size))
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(self.size, min(self.size, lists * 64), False))]
+        )
+
+        # Spherical k-means: cells are compared by dot product like queries
+        self.centroids = sample[rng.choice(len(sample), lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ self.centroids.T, axis=1)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~np.bincount(assignment, minlength=lists).astype(bool)
+            sums[empty] = self.centroids[empty]
+            self.centroids = normalize(sums)
+
+        assignment = np.concatenate(
+            [
+                np.argmax(
+                    vectors[start : start + SCAN_CHUNK_ROWS] @ self.centroids.T, 1
+                )
+                for start in range(0, self.size, SCAN_CHUNK_ROWS)
+            ]
+        )
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(lists + 1))
+        self.cells = [order[bounds[i] : bounds[i + 1]] for i in range(lists)]
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """Sorted row numbers in the cells closest to a query vector."""
+        closest = top_k((self.centroids @ query)[None, :], self.probes)[0]
+        return np.sort(np.concatenate([self.cells[cell] for cell in closest]))
+
+
+class VectorIndex:
+    """Unit vectors keyed by article id in a memory-mapped float32 matrix.
+
+    ``vectors.f32`` holds the rows and ``ids.txt`` their article ids, one
+    per line; rows are appended or overwritten in place and never move.
+    Readers in other processes pick up appended rows on their next query.
+
+    Writers hold an exclusive lock on ``index.lock``, so ingest and UI
+    processes can add vectors at the same time. Rows are written before
+    their ids, and a writer first trims whatever an interrupted write left
+    unpaired, so an id never maps to another article's row.
+    """
+
+    def __init__(self, dim: int, model: str, path: Optional[str] = None):
+        self.path = path or EMBEDDING_SETTINGS["path"]
+        self.dim = dim
+        self.model = model
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.ids_path = os.path.join(self.path, "ids.txt")
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.lock_path = os.path.join(self.path, "index.lock")
+        self.ann_threshold = EMBEDDING_SETTINGS["ann_threshold"]
+        self.ann_probes = EMBEDDING_SETTINGS["ann_probes"]
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._ids_size = -1
+        self._matrix: Optional[np.ndarray] = None
+        self._ivf: Optional[IVFIndex] = None
+        os.makedirs(self.path, exist_ok=True)
+        with self._writing():
+            self._check_meta()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Hold the thread lock and, where supported, the index file lock."""
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Closing the file releases the lock
+            yield
+
+    def _repair(self) -> None:
+        """Trim rows or ids left unpaired by an interrupted write.
+
+        Only called with the file lock held, so a mismatch can't be a write
+        still in progress.
+        """
+        ids = b""
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, "rb") as f:
+                ids = f.read()
+        row_size = 4 * self.dim
+        vectors_size = (
+            os.path.getsize(self.vectors_path)
+            if os.path.exists(self.vectors_path)
+            else 0
+        )
+        lines = ids.count(b"\n")
+        count = min(lines, vectors_size // row_size)
+
+        if count == lines:
+            # Only a partial last line, if anything, goes
+            ids_size = ids.rindex(b"\n") + 1 if count else 0
+        else:
+            ids_size = sum(len(line) + 1 for line in ids.split(b"\n")[:count])
+        if ids_size != len(ids) or vectors_size != count * row_size:
+            self.logger.warning(
+                f"Trimming an interrupted write from the vector index: keeping "
+                f"{count} rows of {vectors_size / row_size:.2f} and "
+                f"{ids_size} of {len(ids)} id bytes"
+            )
+            for path, size in (
+                (self.ids_path, ids_size),
+                (self.vectors_path, count * row_size),
+            ):
+                if os.path.exists(path):
+                    os.truncate(path, size)
+
+    def _check_meta(self) -> None:
+        meta = {"model": self.model, "dim": self.dim}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                if json.load(f) == meta:
+                    return
+            # Vectors of another model can't be compared with new queries
+            self.logger.warning(
+                f"Embedding model changed to {self.model}, clearing the index; "
+                "re-embed stored articles with --backfill-embeddings"
+            )
+        for path in (self.vectors_path, self.ids_path):
+            if os.path.exists(path):
+                os.remove(path)
+        with open(self.meta_path, "w") as f:
+            json.dump(meta, f)
+
+    def _refresh(self) -> None:
+        """Re-map the matrix if rows were appended since the last read."""
+        size = os.path.getsize(self.ids_path) if os.path.exists(self.ids_path) else 0
+        if size == self._ids_size:
+            return
+        ids = []
+        if size:
+            with open(self.ids_path, "r") as f:
+                # A line still being written by another process has no newline
+                ids = f.read().rpartition("\n")[0].splitlines()
+        # Vectors are written before their ids, so every listed id has a row
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if ids else 0
+        ids = ids[:rows]
+        self._ids = ids
+        self._rows = {article_id: row for row, article_id in enumerate(ids)}
+        self._matrix = (
+            np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(ids), self.dim),
+            )
+            if ids
+            else None
+        )
+        self._ids_size = size
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Store vectors, overwriting the rows of ids that are already indexed."""
+        with self._writing():
+            self._repair()
+            self._refresh()
+            vectors = np.asarray(vectors, dtype=np.float32)
+            latest = {article_id: i for i, article_id in enumerate(ids)}
+            existing = [
+                (self._rows[a], i) for a, i in latest.items() if a in self._rows
+            ]
+            new = [(a, i) for a, i in latest.items() if a not in self._rows]
+
+            if existing:
+                matrix = np.memmap(
+                    self.vectors_path,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(len(self._ids), self.dim),
+                )
+                rows, positions = map(list, zip(*existing))
+                matrix[rows] = vectors[positions]
+                matrix.flush()
+            if new:
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors[[i for _, i in new]].tobytes())
+                with open(self.ids_path, "a") as f:
+                    f.write("".join(f"{article_id}\n" for article_id, _ in new))
+            self._refresh()
+
+    def vectors(self, ids: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """The stored vectors of the given ids that are indexed."""
+        with self._lock:
+            self._refresh()
+            found = [article_id for article_id in ids if article_id in self._rows]
+            if not found:
+                return [], np.empty((0, self.dim), dtype=np.float32)
+            return found, np.asarray(self._matrix[[self._rows[a] for a in found]])
+
+    def _ann(self) -> Optional[IVFIndex]:
+        """The IVF index for large matrices, retrained after 20% growth."""
+        rows = len(self._ids)
+        if rows < self.ann_threshold:
+            return None
+        if self._ivf is None or rows > self._ivf.size * 1.2:
+            lists = EMBEDDING_SETTINGS["ann_lists"] or int(np.sqrt(rows))
+            self._ivf = IVFIndex(self._matrix, lists, self.ann_probes)
+            self.logger.info(f"Trained IVF index with {lists} cells over {rows} rows")
+        return self._ivf
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        candidates: Optional[Iterable[str]] = None,
+        exclude: Optional[Sequence[Iterable[str]]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """Top-``k`` ``(id, score)`` pairs for each query vector, best first.
+
+        ``candidates`` restricts the search to those ids and always scans
+        them exactly; ``exclude`` gives ids to leave out per query.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            if self._matrix is None:
+                return [[] for _ in queries]
+            matrix, ids = self._matrix, self._ids
+            ivf = self._ann() if candidates is None else None
+            rows = None
+            if candidates is not None:
+                rows = np.array(
+                    sorted({self._rows[a] for a in candidates if a in self._rows}),
+                    dtype=np.int64,
+                )
+        exclude = [set(skip) for skip in exclude] if exclude else None
+        # Fetch enough extra hits that excluded ids can't leave a query short
+        fetch = k + max(map(len, exclude)) if exclude else k
+
+        if ivf is not None:
+            # Probed cells per query, plus rows appended since training
+            tail = np.arange(ivf.size, len(ids))
+            per_query = [
+                self._scan(
+                    matrix,
+                    query[None, :],
+                    np.concatenate([ivf.candidates(query), tail]),
+                    fetch,
+                )
+                for query in queries
+            ]
+            hits = [result[0] for result in per_query]
+        else:
+            hits = self._scan(matrix, queries, rows, fetch)
+
+        results = []
+        for i, query_hits in enumerate(hits):
+            skip = exclude[i] if exclude else ()
+            results.append(
+                [
+                    (ids[row], score)
+                    for row, score in query_hits
+                    if ids[row] not in skip
+                ][:k]
+            )
+        return results
+
+    @staticmethod
+    def _scan(
+        matrix: np.ndarray, queries: np.ndarray, rows: Optional[np.ndarray], k: int
+    ) -> List[List[Tuple[int, float]]]:
+        """Exact top-k over the given rows (all rows if None), chunk by chunk."""
+        total = len(matrix) if rows is None else len(rows)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, total, SCAN_CHUNK_ROWS):
+            if rows is None:
+                chunk_rows = np.arange(start, min(total, start + SCAN_CHUNK_ROWS))
+                chunk = matrix[start : start + SCAN_CHUNK_ROWS]
+            else:
+                chunk_rows = rows[start : start + SCAN_CHUNK_ROWS]
+                chunk = matrix[chunk_rows]
+            scores = np.concatenate([best_scores, queries @ chunk.T], axis=1)
+            candidates = np.concatenate(
+                [
+                    best_rows,
+                    np.broadcast_to(chunk_rows, (len(queries), len(chunk_rows))),
+                ],
+                axis=1,
+            )
+            best = top_k(scores, k)
+            best_rows = np.take_along_axis(candidates, best, axis=1)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+        return [
+            list(zip(row_ids.tolist(), scores.tolist()))
+            for row_ids, scores in zip(best_rows, best_scores)
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+
+class SemanticIndex:
+    """Search by meaning and related articles over the embedded articles.
+
+    Near-duplicates are not embedded; they share their canonical article's
+    summary and would only crowd out other results.
+    """
+
+    def __init__(self, embedder=None, path: Optional[str] = None):
+        self.embedder = embedder or create_embedder()
+        self.index = VectorIndex(self.embedder.dim, self.embedder.name, path)
+        self.min_score = EMBEDDING_SETTINGS["min_score"]
+        self.logger = logging.getLogger(__name__)
+
+    def add_articles(self, articles: Iterable[Article]) -> int:
+        """Embed and store articles; returns how many were embedded."""
+        articles = [article for article in articles if article.duplicate_of is None]
+        batch_size = EMBEDDING_SETTINGS["batch_size"]
+        try:
+            for start in range(0, len(articles), batch_size):
+                batch = articles[start : start + batch_size]
+                vectors = self.embedder.embed([article_text(a) for a in batch])
+                self.index.add([article.id for article in batch], vectors)
+            return len(articles)
+        except Exception as e:
+            self.logger.error(f"Error embedding articles: {str(e)}")
+            return 0
+
+    def _filter(self, results: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        return [
+            (article_id, score)
+            for article_id, score in results
+            if score >= self.min_score
+        ]
+
+    def search(
+        self, query: str, k: int = 20, candidates: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Ids of the articles closest in meaning to a query, best first."""
+        vector = self.embedder.embed([query])
+        return self._filter(self.index.search(vector, k, candidates)[0])
+
+    def related(
+        self, article_ids: Sequence[str], k: int = 3
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """The ``k`` closest other articles for each id, in one batched query."""
+        ids, vectors = self.index.vectors(article_ids)
+        if not ids:
+            return {}
+        results = self.index.search(
+            vectors, k, exclude=[[article_id] for article_id in ids]
+        )
+        return {
+            article_id: self._filter(hits) for article_id, hits in zip(ids, results)
+        }
@@ -0,0 +1,116 @@
+# fetcher.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import SCRAPING_SETTINGS
+from http_cache import HTTPCache
+from metrics import CACHE_LOOKUPS
+from models import FetchResponse
+
+
+class AsyncFetcher:
+    """Shared aiohttp client with bounded global and per-host concurrency.
+
+    Use it as an async context manager so a single connection pool is shared
+    by every request made during one scraping run. Requests queue for a
+    global and a per-host slot before they start, so ``timeout`` only covers
+    the request itself and not the wait behind other requests to the host. When an ``HTTPCache`` is
+    given, requests are made conditional on the stored validators and a 304
+    is answered from the cached body.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[HTTPCache] = None,
+    ):
+        self.headers = headers or {"User-Agent": SCRAPING_SETTINGS["user_agent"]}
+        self.max_concurrency = (
+            max_concurrency or SCRAPING_SETTINGS["max_concurrent_requests"]
+        )
+        self.max_per_host = max_per_host or SCRAPING_SETTINGS["max_requests_per_host"]
+        self.timeout = timeout or SCRAPING_SETTINGS["request_timeout"]
+        self.cache = cache
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency, limit_per_host=self.max_per_host
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._host_slots = {}
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        """Wait for a free connection to the URL's host, without a timeout."""
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        # Take the host slot first so a busy host does not hold global slots
+        async with self._host_slots[host], self._slots:
+            yield
+
+    async def fetch(self, url: str) -> FetchResponse:
+        """Fetch a URL, revalidating any cached copy."""
+        if self.session is None:
+            raise RuntimeError("AsyncFetcher must be used inside 'async with'")
+
+        async with self._slot(url):
+            return await self._fetch(url)
+
+    async def _fetch(self, url: str) -> FetchResponse:
+        cached = self.cache.get(url) if self.cache is not None else None
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if self.cache is not None:
+                    hit = response.status == 304 and cached is not None
+                    CACHE_LOOKUPS.inc(cache="http", result="hit" if hit else "miss")
+                if response.status == 304 and cached is not None:
+                    self.cache.touch(url)
+                    return FetchResponse(
+                        url=url, status=304, text=cached.body, not_modified=True
+                    )
+
+                response.raise_for_status()
+                text = await response.text(errors="replace")
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                if self.cache is not None and (etag or last_modified):
+                    self.cache.put(url, text, etag=etag, last_modified=last_modified)
+
+                return FetchResponse(url=url, status=response.status, text=text)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Timed out after {self.timeout}s fetching {url}")
+
+    async def fetch_text(self, url: str) -> str:
+        """Fetch a URL and return the decoded response body."""
+        return (await self.fetch(url)).text
@@ -0,0 +1,124 @@
+# http_cache.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import CACHE_SETTINGS
+from models import CachedResponse
+
+
+class HTTPCache:
+    """On-disk store of page bodies and their validators for conditional GETs.
+
+    Entries expire ``cache_duration`` seconds after they were last stored or
+    revalidated, and the least recently used entries are evicted once more
+    than ``max_cache_items`` are held.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_items: Optional[int] = None,
+    ):
+        self.path = path or CACHE_SETTINGS["http_cache_path"]
+        self.ttl = ttl if ttl is not None else CACHE_SETTINGS["cache_duration"]
+        self.max_items = max_items or CACHE_SETTINGS["max_cache_items"]
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the live entry for ``url``, dropping it if it has expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            etag, last_modified, body, stored_at = row
+            if now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url)
+            )
+            self._conn.commit()
+
+        return CachedResponse(
+            url=url, etag=etag, last_modified=last_modified, body=body
+        )
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store a response body with its validators and enforce the size bound."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (url, etag, last_modified, body, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (url, etag, last_modified, body, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated by a 304 response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        self._conn.execute(
+            "DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl,)
+        )
+        self._conn.execute(
+            """
+            DELETE FROM responses WHERE url IN (
+                SELECT url FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_items,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
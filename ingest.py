@@ -0,0 +1,200 @@
+# ingest.py
+"""Headless ingestion of articles into the shared article store.
+
+Run once:          python -m ingest --once
+Run periodically:  python -m ingest --every 15m
+
+Only the sources the adaptive refresh schedule reports as due are scraped;
+pass --all-sources to scrape every source on each run.
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from ai_processor import AIProcessor
+from article_store import ArticleStore
+from columnar_store import ColumnarArticleStore
+from config import (
+    EMBEDDING_SETTINGS,
+    INGEST_SETTINGS,
+    LLM_SETTINGS,
+    METRICS_SETTINGS,
+    REFRESH_SETTINGS,
+)
+from dedup import Deduplicator
+from embeddings import SemanticIndex
+from metrics import start_http_server
+from models import Settings
+from pipeline import ArticlePipeline
+from refresh_scheduler import RefreshScheduler
+from scraper import NewsScraperAgent
+
+logger = logging.getLogger("ingest")
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value: str) -> float:
+    """Parse an interval such as '900', '30s', '15m' or '1h' into seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", value.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid interval: {value!r}")
+    amount, unit = match.groups()
+    return float(amount) * INTERVAL_UNITS[unit or "s"]
+
+
+async def ingest_once(
+    scraper: NewsScraperAgent,
+    ai_processor: AIProcessor,
+    store: ArticleStore,
+    archive: ColumnarArticleStore,
+    deduplicator: Deduplicator,
+    refresh_scheduler: Optional[RefreshScheduler] = None,
+    semantic_index: Optional[SemanticIndex] = None,
+) -> int:
+    """Scrape due sources and store new or changed articles; return how many."""
+    pipeline = ArticlePipeline(
+        scraper,
+        ai_processor.process_article,
+        store=store,
+        deduplicator=deduplicator,
+        refresh_scheduler=refresh_scheduler,
+        process_batch=(
+            ai_processor.process_articles if LLM_SETTINGS["batch_mode"] else None
+        ),
+    )
+    articles = [article async for article in pipeline.stream()]
+    archive.append(articles)
+    if semantic_index is not None:
+        semantic_index.add_articles(articles)
+    if refresh_scheduler is not None:
+        refresh_scheduler.save()
+    return len(articles)
+
+
+async def run(
+    once: bool,
+    interval: float,
+    parse_workers: Optional[int],
+    backfill_archive: bool = False,
+    all_sources: bool = False,
+    backfill_embeddings: bool = False,
+) -> None:
+    settings = Settings()
+    store = ArticleStore()
+    scraper = NewsScraperAgent(parse_workers=parse_workers, article_store=store)
+    ai_processor = AIProcessor(api_key=settings.groq_api_key)
+    archive = ColumnarArticleStore()
+    # Shared across runs so the fingerprint index is only loaded once
+    deduplicator = Deduplicator(store)
+    refresh_scheduler = None
+    if REFRESH_SETTINGS["enabled"] and not all_sources:
+        refresh_scheduler = RefreshScheduler()
+    semantic_index = SemanticIndex() if EMBEDDING_SETTINGS["enabled"] else None
+    if backfill_archive:
+        archive.append(store.get_articles())
+    if backfill_embeddings and semantic_index is not None:
+        count = semantic_index.add_articles(store.get_articles())
+        logger.info(f"Embedded {count} stored articles")
+
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                count = await ingest_once(
+                    scraper,
+                    ai_processor,
+                    store,
+                    archive,
+                    deduplicator,
+                    refresh_scheduler,
+                    semantic_index,
+                )
+                logger.info(
+                    f"Ingested {count} new articles in "
+                    f"{time.monotonic() - started:.1f}s ({store.count()} stored)"
+                )
+            except Exception as e:
+                logger.error(f"Ingestion run failed: {str(e)}")
+
+            if once:
+                break
+            delay = interval - (time.monotonic() - started)
+            if refresh_scheduler is not None:
+                # Wake when the next source is due, but at least every interval
+                next_due = refresh_scheduler.next_due(scraper.websites_config)
+                delay = min(delay, (next_due - datetime.now()).total_seconds())
+            await asyncio.sleep(max(1.0, delay))
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape and summarize articles into the shared article store."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="Run a single ingestion")
+    mode.add_argument(
+        "--every",
+        type=parse_interval,
+        default=parse_interval(INGEST_SETTINGS["interval"]),
+        help="Longest wait between runs, e.g. 30s, 15m, 1h; runs also start "
+        "whenever a source is due (default: %(default)ss)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parse pages in this many processes (default: SCRAPING_SETTINGS)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_SETTINGS["port"],
+        help="Serve Prometheus metrics on this port, 0 to disable "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--all-sources",
+        action="store_true",
+        help="Scrape every source on each run instead of only the due ones",
+    )
+    parser.add_argument(
+        "--backfill-archive",
+        action="store_true",
+        help="Copy every stored article into the Parquet archive first",
+    )
+    parser.add_argument(
+        "--backfill-embeddings",
+        action="store_true",
+        help="Embed every stored article for semantic search first",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+        logger.info(f"Serving metrics on :{args.metrics_port}/metrics")
+    try:
+        asyncio.run(
+            run(
+                args.once,
+                args.every,
+                args.parse_workers,
+                args.backfill_archive,
+                args.all_sources,
+                args.backfill_embeddings,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# llm_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from config import CACHE_SETTINGS
+from metrics import CACHE_LOOKUPS
+
+
+class LLMCache:
+    """Persistent cache of LLM results keyed by content hash, model and prompt.
+
+    Entries expire ``llm_cache_duration`` seconds after they were written and
+    the least recently used entries are evicted beyond ``llm_max_cache_items``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_items: Optional[int] = None,
+    ):
+        self.path = path or CACHE_SETTINGS["llm_cache_path"]
+        self.ttl = ttl if ttl is not None else CACHE_SETTINGS["llm_cache_duration"]
+        self.max_items = max_items or CACHE_SETTINGS["llm_max_cache_items"]
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(task: str, content: str, model: str, prompt_version: int) -> str:
+        """Build a cache key from the task, model, prompt version and content."""
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{task}:{model}:v{prompt_version}:{content_hash}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                CACHE_LOOKUPS.inc(cache="llm", result="miss")
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                CACHE_LOOKUPS.inc(cache="llm", result="miss")
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        CACHE_LOOKUPS.inc(cache="llm", result="hit")
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value and enforce the size bound."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO results (key, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        self._conn.execute(
+            "DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        self._conn.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_items,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,177 @@
+# llm_scheduler.py
+import asyncio
+import logging
+import random
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from config import LLM_SETTINGS
+from metrics import (
+    LLM_REQUEST_SECONDS,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    LLM_WAIT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    import groq
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class LLMScheduler:
+    """Rate-limit-aware front for a Groq async client.
+
+    Caps the number of requests in flight, paces requests and tokens per
+    minute with token buckets, and retries retryable failures with jittered
+    exponential backoff, honoring ``Retry-After`` when the API sends one.
+    A rate-limit response pauses every caller until the advertised time.
+
+    Pass ``client_factory`` instead of ``client`` when the scheduler is shared
+    by several event loops (e.g. Streamlit sessions); each loop then gets its
+    own client and in-flight limit while the rate budgets stay shared.
+    """
+
+    def __init__(
+        self,
+        client: Optional["groq.AsyncGroq"] = None,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        client_factory: Optional[Callable[[], "groq.AsyncGroq"]] = None,
+    ):
+        if client is None and client_factory is None:
+            raise ValueError("LLMScheduler needs a client or a client_factory")
+        self.client = client
+        self.client_factory = client_factory
+        self.max_in_flight = max_in_flight or LLM_SETTINGS["max_in_flight"]
+        self.max_retries = (
+            max_retries if max_retries is not None else LLM_SETTINGS["max_retries"]
+        )
+        self.base_delay = LLM_SETTINGS["retry_base_delay"]
+        self.max_delay = LLM_SETTINGS["retry_max_delay"]
+        self.request_bucket = TokenBucket(
+            requests_per_minute or LLM_SETTINGS["requests_per_minute"]
+        )
+        self.token_bucket = TokenBucket(
+            tokens_per_minute or LLM_SETTINGS["tokens_per_minute"]
+        )
+        self.logger = logging.getLogger(__name__)
+        self._resume_at = 0.0
+        # Event loop -> (in-flight semaphore, client)
+        self._bindings = weakref.WeakKeyDictionary()
+
+    def _bind(self) -> Tuple[asyncio.Semaphore, "groq.AsyncGroq"]:
+        # Semaphores and async clients belong to one event loop, and Streamlit
+        # runs each refresh in its own loop, so keep one pair per loop
+        loop = asyncio.get_running_loop()
+        binding = self._bindings.get(loop)
+        if binding is None:
+            client = self.client_factory() if self.client_factory else self.client
+            binding = (asyncio.Semaphore(self.max_in_flight), client)
+            self._bindings[loop] = binding
+        return binding
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = (
+            response.headers.get("retry-after") if response is not None else None
+        )
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, self.base_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def create(self, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        """Schedule a chat completion request and return the completion."""
+        # groq is slow to import, so it is only loaded once a request is made
+        import groq
+
+        # Errors worth retrying: rate limits, server-side failures and transport issues
+        retryable_errors = (
+            groq.RateLimitError,
+            groq.InternalServerError,
+            groq.APIConnectionError,
+            groq.APITimeoutError,
+        )
+        semaphore, client = self._bind()
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        budget = prompt_tokens + kwargs.get("max_tokens", 0)
+
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.perf_counter()
+            async with semaphore:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self.request_bucket.acquire(1)
+                await self.token_bucket.acquire(budget)
+
+                started = time.perf_counter()
+                LLM_WAIT_SECONDS.observe(started - queued_at)
+                try:
+                    completion = await client.chat.completions.create(
+                        messages=messages, **kwargs
+                    )
+                except Exception as e:
+                    LLM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - started, outcome="error"
+                    )
+                    if (
+                        not isinstance(e, retryable_errors)
+                        or attempt == self.max_retries
+                    ):
+                        raise
+                    LLM_RETRIES.inc(error=type(e).__name__)
+                    delay = self._backoff_delay(attempt, e)
+                    if isinstance(e, groq.RateLimitError):
+                        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                    self.logger.warning(
+                        f"LLM request failed ({type(e).__name__}), retrying in "
+                        f"{delay:.1f}s (attempt {attempt + 1}/{self.max_retries})"
+                    )
+                else:
+                    LLM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - started, outcome="ok"
+                    )
+                    usage = getattr(completion, "usage", None)
+                    if usage is not None:
+                        LLM_TOKENS.inc(usage.prompt_tokens or 0, direction="in")
+                        LLM_TOKENS.inc(usage.completion_tokens or 0, direction="out")
+                    return completion
+
+            await asyncio.sleep(delay)
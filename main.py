@@ -1,27 +1,58 @@
 # main.py
 import asyncio
 import streamlit as st
-from scraper import NewsScraperAgent
 from datetime import datetime, timedelta
-import pandas as pd
-from config import WEBSITE_CONFIGS
-import groq
-from models import Settings
+import pyarrow as pa
+from config import (
+    WEBSITE_CONFIGS,
+    LLM_SETTINGS,
+    INGEST_SETTINGS,
+    ARTICLE_SETTINGS,
+    UI_SETTINGS,
+)
+from content_prep import NO_CONTENT_SUMMARY, clean_content, truncate_to_tokens
+from models import Article, SearchQuery
+from llm_cache import LLMCache
+from metrics import LLM_TASK_SECONDS
+from columnar_store import SORT_ORDERS, ColumnarArticleStore
+from pagination import page_size_selector, paginate
+from resources import (
+    get_archive,
+    get_article_store,
+    get_article_table,
+    get_deduplicator,
+    get_llm_cache,
+    get_llm_scheduler,
+    get_scraper,
+    get_semantic_index,
+    refresh_articles,
+)
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize settings
-settings = Settings()
-
-# Initialize Groq client
-client = groq.Groq(api_key=settings.groq_api_key)
+# Summaries are cached by content so repeat articles skip the API
+SUMMARY_PROMPT_VERSION = 1
 
 
 async def summarize_article(content: str) -> str:
     """Summarize article content using Groq."""
+    content = clean_content(content)
+    if len(content) < ARTICLE_SETTINGS["min_article_length"]:
+        # Too short to be worth a request; the text is its own summary
+        return content or NO_CONTENT_SUMMARY
+    content = truncate_to_tokens(content, ARTICLE_SETTINGS["max_content_tokens"])
+
+    cache_key = LLMCache.make_key(
+        "main_summary", content, LLM_SETTINGS["model"], SUMMARY_PROMPT_VERSION
+    )
+    llm_cache = get_llm_cache()
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         prompt = f"""Please provide a concise summary of the following article, focusing on the key points and insights:
 
@@ -29,14 +60,17 @@ async def summarize_article(content: str) -> str:
 
         Summary:"""
 
-        completion = await client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="mixtral-8x7b-32768",
-            temperature=0.3,
-            max_tokens=500,
-        )
+        with LLM_TASK_SECONDS.time(task="main_summary"):
+            completion = await get_llm_scheduler().create(
+                messages=[{"role": "user", "content": prompt}],
+                model=LLM_SETTINGS["model"],
+                temperature=LLM_SETTINGS["temperature"],
+                max_tokens=500,
+            )
 
-        return completion.choices[0].message.content
+        summary = completion.choices[0].message.content
+        llm_cache.set(cache_key, summary)
+        return summary
     except Exception as e:
         logger.error(f"Error summarizing article: {str(e)}")
         return "Error generating summary"
@@ -44,26 +78,88 @@ async def summarize_article(content: str) -> str:
 
 def initialize_session_state():
     """Initialize session state variables."""
-    if "articles" not in st.session_state:
-        st.session_state.articles = []
     if "last_update" not in st.session_state:
         st.session_state.last_update = None
 
 
-async def fetch_and_process_articles():
-    """Fetch and process articles from all sources."""
-    scraper = NewsScraperAgent()
-    results = await scraper.scrape_all_websites()
+async def process_article(article: Article) -> Article:
+    """Attach a summary to a scraped article."""
+    article.summary = await summarize_article(article.content)
+    return article
+
 
-    all_articles = []
-    for result in results:
-        if result.success:
-            for article in result.articles:
-                # Summarize article content
-                article.summary = await summarize_article(article.content)
-                all_articles.append(article)
+async def fetch_and_process_articles(on_article=None):
+    """Fetch and process articles from all sources.
 
-    return all_articles
+    Only articles that are new or changed since the last refresh are
+    summarized. ``on_article`` is called with each one as soon as its summary
+    is ready; the result merges them with the stored ones.
+    """
+    # The scraping stack is only loaded when this app ingests itself
+    from pipeline import ArticlePipeline
+
+    pipeline = ArticlePipeline(
+        get_scraper(),
+        process_article,
+        store=get_article_store(),
+        deduplicator=get_deduplicator(),
+    )
+    articles = []
+    async for article in pipeline.stream():
+        articles.append(article)
+        if on_article is not None:
+            on_article(article)
+
+    get_archive().append(articles)
+    get_semantic_index().add_articles(articles)
+    refresh_articles()
+    return articles
+
+
+def render_article(article: Article, container=st, related=None):
+    """Render a single article as an expander."""
+    with container.expander(f"{article.title} - {article.source}"):
+        st.write(f"Published: {article.published_date.strftime('%Y-%m-%d')}")
+        st.write("Summary:")
+        st.write(article.summary)
+        st.write("Original Article:")
+        st.write(article.url)
+        if related:
+            st.write("Related:")
+            st.markdown("\n".join(f"- [{title}]({url})" for title, url in related))
+
+
+def search_table(
+    table: pa.Table, query: SearchQuery, by_meaning: bool, limit: int
+) -> pa.Table:
+    """The rows of ``table`` matching a search, best first."""
+    if by_meaning:
+        # Nearest embeddings among the rows that passed the filters
+        matches = get_semantic_index().search(
+            query.query, k=limit, candidates=table.column("id").to_pylist()
+        )
+        ids = [article_id for article_id, _ in matches]
+    else:
+        # Ranked full-text search; only ids are read from the index
+        ids = get_article_store().search_ids(query, limit=limit)
+    return ColumnarArticleStore.take_ids(table, ids)
+
+
+def related_articles(articles, k: int = 3):
+    """Title and URL of the ``k`` closest articles to each one, by article id.
+
+    Related articles may lie outside the current filters, so their links are
+    read from the store by id.
+    """
+    related = get_semantic_index().related([article.id for article in articles], k)
+    related_ids = {article_id for hits in related.values() for article_id, _ in hits}
+    if not related_ids:
+        return {}
+    links = get_article_store().get_links(related_ids)
+    return {
+        article_id: [links[hit] for hit, _ in hits if hit in links]
+        for article_id, hits in related.items()
+    }
 
 
 def main():
@@ -75,18 +171,42 @@ def main():
     # Sidebar
     st.sidebar.title("Controls")
     if st.sidebar.button("Refresh Articles"):
-        st.session_state.articles = asyncio.run(fetch_and_process_articles())
+        if INGEST_SETTINGS["ui_ingest"]:
+            # Show new articles as they are summarized, then rerun for the full list
+            live = st.container()
+            live.caption("Fetching new articles...")
+            asyncio.run(
+                fetch_and_process_articles(
+                    on_article=lambda article: render_article(article, live)
+                )
+            )
+        else:
+            # Articles are ingested by ingest.py; the UI only reads the store
+            refresh_articles()
         st.session_state.last_update = datetime.now()
+        st.rerun()
 
-    # Filter options
-    sources = list(WEBSITE_CONFIGS.keys())
+    # Filter options; articles are tagged with the source's display name
+    sources = [config["name"] for config in WEBSITE_CONFIGS.values()]
     selected_sources = st.sidebar.multiselect(
         "Select Sources", sources, default=sources
     )
 
     days_ago = st.sidebar.slider("Show articles from last X days", 1, 30, 7)
 
+    keyword_filter = st.sidebar.text_input("Keywords (comma separated)")
+
     search_query = st.sidebar.text_input("Search articles")
+    search_by_meaning = st.sidebar.checkbox(
+        "Search by meaning", help="Rank by semantic similarity, not exact words"
+    )
+
+    # Relevance only means something for a search; default to it then
+    orders = [order for order in SORT_ORDERS if search_query or order != "Relevance"]
+    sort_order = st.sidebar.selectbox(
+        "Sort by", orders, index=orders.index("Relevance") if search_query else 0
+    )
+    page_size = page_size_selector("articles")
 
     # Display last update time
     if st.session_state.last_update:
@@ -94,33 +214,66 @@ def main():
             f"Last updated: {st.session_state.last_update.strftime('%Y-%m-%d %H:%M')}"
         )
 
-    # Filter and display articles
-    if st.session_state.articles:
-        filtered_articles = [
-            article
-            for article in st.session_state.articles
-            if article.source in selected_sources
-            and article.published_date >= datetime.now() - timedelta(days=days_ago)
-        ]
+    # Reading and tabulating metrics is skipped on reruns unless asked for
+    if st.sidebar.checkbox("Show diagnostics"):
+        from diagnostics import render_diagnostics
 
+        render_diagnostics()
+
+    # Filter and display articles; only the partitions of the selected
+    # sources and days are read, and the table is shared by all sessions
+    date_from = datetime.now() - timedelta(days=days_ago)
+    table = get_article_table(tuple(selected_sources), date_from.date())
+    if table.num_rows or get_article_store().count():
+        keywords = [k.strip() for k in keyword_filter.split(",") if k.strip()]
+
+        # Vectorized predicates over the shared table; no models are built yet
+        filtered = ColumnarArticleStore.filter_table(
+            table,
+            sources=selected_sources,
+            date_from=date_from,
+            keywords=keywords,
+            include_duplicates=False,
+        )
         if search_query:
-            filtered_articles = [
-                article
-                for article in filtered_articles
-                if search_query.lower() in article.title.lower()
-                or search_query.lower() in article.summary.lower()
-            ]
-
-        # Display articles
-        for article in filtered_articles:
-            with st.expander(f"{article.title} - {article.source}"):
-                st.write(f"Published: {article.published_date.strftime('%Y-%m-%d')}")
-                st.write("Summary:")
-                st.write(article.summary)
-                st.write("Original Article:")
-                st.write(article.url)
+            filtered = search_table(
+                filtered,
+                SearchQuery(
+                    query=search_query,
+                    sources=selected_sources,
+                    date_from=date_from,
+                ),
+                search_by_meaning,
+                UI_SETTINGS["search_limit"],
+            )
+        filtered = ColumnarArticleStore.sort_table(filtered, sort_order)
+
+        # Only the visible page is turned into models and rendered, so a
+        # rerun costs the same however large the archive grows
+        start, stop = paginate(
+            filtered.num_rows,
+            page_size,
+            key="articles",
+            reset_on=(
+                tuple(selected_sources),
+                days_ago,
+                tuple(keywords),
+                search_query,
+                search_by_meaning,
+                sort_order,
+                page_size,
+            ),
+        )
+        page_articles = ColumnarArticleStore.to_articles(
+            filtered.slice(start, stop - start)
+        )
+
+        # Related articles for the whole page come from one batched query
+        related = related_articles(page_articles)
+        for article in page_articles:
+            render_article(article, related=related.get(article.id))
     else:
-        st.info("Click 'Refresh Articles' to fetch the latest news.")
+        st.info("Click 'Refresh Articles' to load the latest news.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,329 @@
+# metrics.py
+"""In-process counters and histograms exposed in the Prometheus text format.
+
+The module-level metrics below are updated by the scraper, crawler, fetcher,
+caches and LLM clients. ``start_http_server`` serves them on ``/metrics`` for a
+Prometheus scrape; ``REGISTRY.samples()`` feeds the Streamlit diagnostics.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from fast cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$")
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+ESCAPED = re.compile(r"\\(.)")
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base class for a metric family with a fixed set of label names."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [Sample(self.name, self._labels(key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time spent in the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+
+        samples = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(
+                    Sample(
+                        f"{self.name}_bucket",
+                        {**labels, "le": _format_value(bound)},
+                        cumulative,
+                    )
+                )
+            samples.append(Sample(f"{self.name}_sum", labels, total))
+            samples.append(Sample(f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} is already registered")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [sample for metric in metrics for sample in metric.samples()]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample in metric.samples():
+                lines.append(
+                    f"{sample.name}{_format_labels(sample.labels)} "
+                    f"{_format_value(sample.value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def parse_samples(text: str) -> List[Sample]:
+    """Parse Prometheus text output (e.g. from the ingest process) into samples."""
+    samples = []
+    for line in text.splitlines():
+        match = SAMPLE_LINE.match(line.strip())
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        labels = {
+            label: ESCAPED.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), raw)
+            for label, raw in LABEL_PAIR.findall(labels or "")
+        }
+        samples.append(Sample(name, labels, float(value)))
+    return samples
+
+
+def histogram_quantile(quantile: float, buckets: List[Tuple[float, float]]) -> float:
+    """Estimate a quantile from cumulative ``(upper bound, count)`` buckets.
+
+    Interpolates linearly within the bucket holding the quantile, as
+    Prometheus' ``histogram_quantile`` does.
+    """
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] == 0:
+        return float("nan")
+    rank = quantile * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            if count == lower_count:
+                return bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (
+                count - lower_count
+            )
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+REGISTRY = MetricsRegistry()
+
+FETCH_SECONDS = REGISTRY.histogram(
+    "scraper_fetch_seconds", "Time to fetch a source's listing page", ["source"]
+)
+FETCHES = REGISTRY.counter(
+    "scraper_fetches_total",
+    "Listing page fetches by outcome (200, 304 or error)",
+    ["source", "status"],
+)
+CRAWL_FETCHES = REGISTRY.counter(
+    "scraper_crawl_fetches_total",
+    "Feed, sitemap and article page fetches by kind and outcome",
+    ["source", "kind", "status"],
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "scraper_parse_seconds",
+    "Time to parse a source's pages by kind (listing or detail)",
+    ["source", "kind"],
+)
+ARTICLES_PARSED = REGISTRY.counter(
+    "scraper_articles_parsed_total", "Articles extracted from pages", ["source"]
+)
+ARTICLES_FAILED = REGISTRY.counter(
+    "scraper_articles_failed_total",
+    "Article elements that could not be extracted",
+    ["source"],
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "Latency of single LLM API attempts", ["outcome"]
+)
+LLM_WAIT_SECONDS = REGISTRY.histogram(
+    "llm_wait_seconds", "Time LLM requests wait for in-flight and rate limits"
+)
+LLM_TASK_SECONDS = REGISTRY.histogram(
+    "llm_task_seconds", "End-to-end latency of an LLM task incl. retries", ["task"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the LLM API", ["direction"]
+)
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries_total", "LLM requests retried after a failure", ["error"]
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger(__name__).debug(format % args)
+
+
+def start_http_server(
+    port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None
+) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread; returns the running server."""
+    handler = type(
+        "MetricsHandler", (_MetricsHandler,), {"registry": registry or REGISTRY}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    return server
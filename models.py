@@ -2,17 +2,30 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl, Field
-from pydantic_settings import BaseSettings
 
 
-class Settings(BaseSettings):
-    """Application settings with environment variable validation."""
+def _define_settings():
+    # pydantic-settings is slow to import and only needed for the API key
+    from pydantic_settings import BaseSettings
 
-    groq_api_key: str
+    class Settings(BaseSettings):
+        """Application settings with environment variable validation."""
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+        groq_api_key: str
+
+        class Config:
+            env_file = ".env"
+            env_file_encoding = "utf-8"
+
+    return Settings
+
+
+def __getattr__(name: str):
+    # Settings is defined on first access, e.g. ``from models import Settings``
+    if name == "Settings":
+        globals()["Settings"] = _define_settings()
+        return globals()["Settings"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Article(BaseModel):
@@ -31,6 +44,18 @@ class Article(BaseModel):
     processed_date: datetime = Field(
         default_factory=datetime.now, description="Date when the article was processed"
     )
+    duplicate_of: Optional[str] = Field(
+        None, description="Id of the article this one nearly duplicates"
+    )
+
+
+class ArticleInsights(BaseModel):
+    """Summary and keywords returned by a single structured LLM request."""
+
+    summary: str = Field(..., min_length=1, description="Summary of the article")
+    keywords: List[str] = Field(
+        default_factory=list, description="Keywords extracted from the article"
+    )
 
 
 class SearchQuery(BaseModel):
@@ -56,15 +81,84 @@ class WebsiteConfig(BaseModel):
     content_selector: str = Field(..., description="CSS selector for article content")
     date_selector: str = Field(..., description="CSS selector for article date")
     date_format: str = Field(..., description="Format string for parsing dates")
+    feed_url: Optional[HttpUrl] = Field(
+        None, description="RSS or Atom feed listing the website's articles"
+    )
+    sitemap_url: Optional[HttpUrl] = Field(
+        None, description="Sitemap or sitemap index listing the website's articles"
+    )
+    sitemap_url_pattern: Optional[str] = Field(
+        None, description="Regex an article URL from the sitemap must match"
+    )
+    next_page_selector: Optional[str] = Field(
+        None, description="CSS selector for the link to the next listing page"
+    )
+    max_pages: int = Field(
+        1, ge=1, description="Listing pages (or child sitemaps) read per scrape"
+    )
+    max_articles: int = Field(50, ge=1, description="Articles collected per scrape")
+    fetch_details: bool = Field(
+        False, description="Fetch each article's own page for its full content"
+    )
+    detail_content_selector: Optional[str] = Field(
+        None, description="CSS selector for the article body on its own page"
+    )
 
 
 class ScrapingResult(BaseModel):
     """Results from a scraping operation."""
 
     success: bool = Field(..., description="Whether the scraping was successful")
+    source: Optional[str] = Field(None, description="Name of the scraped website")
     articles: List[Article] = Field(
         default_factory=list, description="List of scraped articles"
     )
     errors: List[str] = Field(
         default_factory=list, description="List of errors encountered during scraping"
     )
+
+
+class SourceState(BaseModel):
+    """Refresh schedule and publish history of one website."""
+
+    name: str = Field(..., description="Name of the website")
+    publish_rate: float = Field(
+        0.0, description="Smoothed rate of new articles per hour"
+    )
+    interval: float = Field(0.0, description="Current polling interval in seconds")
+    next_due: datetime = Field(
+        default_factory=datetime.now, description="When the website is due next"
+    )
+    last_checked: Optional[datetime] = Field(None, description="Last successful scrape")
+    last_new_article: Optional[datetime] = Field(
+        None, description="Last scrape that found new articles"
+    )
+    consecutive_failures: int = Field(0, description="Failed scrapes in a row")
+    circuit_open: bool = Field(
+        False, description="Whether failures have tripped the circuit breaker"
+    )
+    known_ids: List[str] = Field(
+        default_factory=list, description="Recently seen article ids, newest first"
+    )
+
+
+class CachedResponse(BaseModel):
+    """A stored page body together with its HTTP validators."""
+
+    url: str = Field(..., description="URL the response was fetched from")
+    etag: Optional[str] = Field(None, description="ETag header of the response")
+    last_modified: Optional[str] = Field(
+        None, description="Last-Modified header of the response"
+    )
+    body: str = Field(..., description="Decoded response body")
+
+
+class FetchResponse(BaseModel):
+    """Result of fetching a single page."""
+
+    url: str = Field(..., description="Requested URL")
+    status: int = Field(..., description="HTTP status code of the response")
+    text: str = Field(..., description="Decoded response body")
+    not_modified: bool = Field(
+        False, description="Whether the body was served from cache after a 304"
+    )
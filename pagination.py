@@ -0,0 +1,69 @@
+# pagination.py
+from typing import Hashable, Tuple
+
+import streamlit as st
+
+from config import UI_SETTINGS
+
+
+def page_size_selector(key: str, container=st.sidebar) -> int:
+    """Let the user pick how many articles one page shows."""
+    sizes = UI_SETTINGS["page_sizes"]
+    return container.selectbox(
+        "Articles per page", sizes, index=min(1, len(sizes) - 1), key=f"{key}_size"
+    )
+
+
+def paginate(
+    total: int, page_size: int, key: str, reset_on: Hashable = None
+) -> Tuple[int, int]:
+    """Render page controls and return the current page's ``[start, stop)``.
+
+    The page number lives in session state under ``key`` and goes back to
+    the first page whenever ``reset_on`` (e.g. the active filters) changes.
+    """
+    state = st.session_state
+    page_key, reset_key = f"{key}_page", f"{key}_reset_on"
+    pages = max(1, -(-total // page_size))
+    if state.get(reset_key) != reset_on:
+        state[reset_key] = reset_on
+        state[page_key] = 1
+    # Clamp before the widget is created; the result set may have shrunk
+    state[page_key] = min(max(1, state.get(page_key, 1)), pages)
+
+    def step(delta: int) -> None:
+        state[page_key] = min(max(1, state[page_key] + delta), pages)
+
+    previous, number, following = st.columns([1, 2, 1])
+    previous.button(
+        "Previous",
+        key=f"{key}_previous",
+        on_click=step,
+        args=(-1,),
+        disabled=state[page_key] <= 1,
+    )
+    number.number_input(
+        f"Page (of {pages})",
+        min_value=1,
+        max_value=pages,
+        step=1,
+        key=page_key,
+        label_visibility="collapsed",
+    )
+    following.button(
+        "Next",
+        key=f"{key}_next",
+        on_click=step,
+        args=(1,),
+        disabled=state[page_key] >= pages,
+    )
+
+    start = (state[page_key] - 1) * page_size
+    stop = min(total, start + page_size)
+    st.caption(
+        f"Showing {start + 1}–{stop} of {total} articles (page "
+        f"{state[page_key]} of {pages})"
+        if total
+        else "No articles match the filters."
+    )
+    return start, stop
@@ -0,0 +1,325 @@
+# parsing.py
+import email.utils
+import re
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from models import WebsiteConfig
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    lxml = None
+
+# "lxml" evaluates precompiled XPath expressions on an lxml tree, falling back
+# to a BeautifulSoup tree restricted to the article subtrees for selectors
+# XPath translation does not cover; "html.parser" builds the full page tree
+# with the stdlib parser.
+PARSE_MODES = ("lxml", "html.parser")
+
+SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+
+# Followed when a paginated website sets no next_page_selector
+DEFAULT_NEXT_PAGE_SELECTOR = 'link[rel~="next"], a[rel~="next"]'
+
+# Where article pages usually state their title and publication date
+DETAIL_TITLE_SELECTORS = ('meta[property="og:title"]', "h1", "title")
+DETAIL_DATE_SELECTORS = (
+    'meta[property="article:published_time"]',
+    'meta[name="date"]',
+    "time[datetime]",
+)
+
+
+class ArticleRecord(NamedTuple):
+    """Fields extracted from one article element.
+
+    With ``fetch_details`` a listing may leave ``content`` empty and
+    ``published_date`` None; the crawler fills them from the article page.
+    """
+
+    title: str
+    content: str
+    published_date: Optional[datetime]
+    url: str
+
+
+class DetailRecord(NamedTuple):
+    """Fields extracted from an article's own page; missing ones are None."""
+
+    title: Optional[str]
+    content: str
+    published_date: Optional[datetime]
+
+
+class CompiledSelectors:
+    """A website's CSS selectors compiled once for reuse across pages."""
+
+    def __init__(self, config: WebsiteConfig):
+        self.article = soupsieve.compile(config.article_selector)
+        self.title = soupsieve.compile(config.title_selector)
+        self.content = soupsieve.compile(config.content_selector)
+        self.date = soupsieve.compile(config.date_selector)
+        self.strainer = build_strainer(config.article_selector)
+        self.xpaths = build_xpaths(config) if lxml is not None else None
+
+
+_compiled: Dict[Tuple[str, str, str, str], CompiledSelectors] = {}
+
+
+def build_strainer(selector: str) -> Optional[SoupStrainer]:
+    """Build a SoupStrainer for simple 'tag', '.class' or 'tag.class' selectors.
+
+    The strainer only narrows tree building; the compiled selector is still
+    applied afterwards, so a looser match (e.g. only the first class) is fine.
+    Returns None for selectors it cannot express.
+    """
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        return None
+    tag, classes = match.groups()
+    class_names = [name for name in classes.split(".") if name]
+    if class_names:
+        return SoupStrainer(tag, class_=class_names[0])
+    return SoupStrainer(tag)
+
+
+def selector_to_xpath(selector: str, axis: str) -> Optional[str]:
+    """Translate a simple 'tag', '.class' or 'tag.class' selector to XPath."""
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        return None
+    tag, classes = match.groups()
+    conditions = "".join(
+        f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+        for name in classes.split(".")
+        if name
+    )
+    return f"{axis}::{tag or '*'}{conditions}"
+
+
+def build_xpaths(config: WebsiteConfig) -> Optional[Dict[str, "etree.XPath"]]:
+    """Compile XPath expressions for a website, or None if any selector is complex."""
+    expressions = {"article": selector_to_xpath(config.article_selector, "descendant")}
+    for name in ("title", "content", "date"):
+        xpath = selector_to_xpath(getattr(config, f"{name}_selector"), "descendant")
+        # CSS select_one returns the first match in document order
+        expressions[name] = f"{xpath}[1]" if xpath else None
+    expressions["link"] = "descendant::a[1]"
+
+    if not all(expressions.values()):
+        return None
+    return {name: etree.XPath(xpath) for name, xpath in expressions.items()}
+
+
+def compile_selectors(config: WebsiteConfig) -> CompiledSelectors:
+    """Return the compiled selectors for a website, compiling them on first use."""
+    key = (
+        config.article_selector,
+        config.title_selector,
+        config.content_selector,
+        config.date_selector,
+    )
+    if key not in _compiled:
+        _compiled[key] = CompiledSelectors(config)
+    return _compiled[key]
+
+
+def build_record(
+    config: WebsiteConfig,
+    title: Optional[str],
+    content: Optional[str],
+    date_text: Optional[str],
+    url: str,
+) -> ArticleRecord:
+    """Build a record from an article element's texts; None marks a missing one.
+
+    Content and date are required unless ``fetch_details`` is set, in which
+    case the article page can supply them.
+    """
+    if title is None:
+        raise ValueError("No title found")
+    optional = config.fetch_details
+    if content is None and not optional:
+        raise ValueError("No content found")
+    if date_text is None and not optional:
+        raise ValueError("No date found")
+
+    published_date = None
+    if date_text is not None:
+        try:
+            published_date = datetime.strptime(date_text, config.date_format)
+        except ValueError:
+            if not optional:
+                raise
+    return ArticleRecord(title, content or "", published_date, url)
+
+
+def _extract_with_xpath(
+    html: Union[str, bytes], config: WebsiteConfig, xpaths: Dict[str, "etree.XPath"]
+) -> Tuple[List[ArticleRecord], List[str]]:
+    try:
+        root = lxml.html.fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be bytes
+        root = lxml.html.fromstring(html.encode("utf-8"))
+    except etree.ParserError as e:
+        return [], [f"{type(e).__name__}: {str(e)}"]
+
+    records, errors = [], []
+    for article_element in xpaths["article"](root):
+        try:
+            texts = {}
+            for name in ("title", "content", "date"):
+                matches = xpaths[name](article_element)
+                texts[name] = matches[0].text_content().strip() if matches else None
+            url = xpaths["link"](article_element)[0].attrib["href"]
+            records.append(
+                build_record(
+                    config, texts["title"], texts["content"], texts["date"], url
+                )
+            )
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {str(e)}")
+
+    return records, errors
+
+
+def extract_records(
+    html: Union[str, bytes], config: WebsiteConfig, mode: str = "lxml"
+) -> Tuple[List[ArticleRecord], List[str]]:
+    """Extract article records from a page.
+
+    Returns the records and an error message for every article element that
+    could not be extracted.
+    """
+    if mode not in PARSE_MODES:
+        raise ValueError(f"Unknown parse mode {mode!r}, expected one of {PARSE_MODES}")
+
+    if mode == "html.parser":
+        soup = BeautifulSoup(html, "html.parser")
+        elements = soup.select(config.article_selector)
+
+        def select_one(element, selector_name):
+            return element.select_one(getattr(config, f"{selector_name}_selector"))
+
+    else:
+        selectors = compile_selectors(config)
+        if selectors.xpaths is not None:
+            return _extract_with_xpath(html, config, selectors.xpaths)
+
+        try:
+            soup = BeautifulSoup(html, "lxml", parse_only=selectors.strainer)
+        except FeatureNotFound:
+            soup = BeautifulSoup(html, "html.parser", parse_only=selectors.strainer)
+        elements = selectors.article.select(soup)
+
+        def select_one(element, selector_name):
+            return getattr(selectors, selector_name).select_one(element)
+
+    records, errors = [], []
+    for article_element in elements:
+        try:
+            texts = {}
+            for name in ("title", "content", "date"):
+                element = select_one(article_element, name)
+                texts[name] = element.text.strip() if element is not None else None
+            url = article_element.find("a")["href"]
+            records.append(
+                build_record(
+                    config, texts["title"], texts["content"], texts["date"], url
+                )
+            )
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {str(e)}")
+
+    return records, errors
+
+
+def parse_page(
+    html: bytes, config: WebsiteConfig, mode: str = "lxml"
+) -> Tuple[List[ArticleRecord], List[str]]:
+    """Process-pool entry point: parse a UTF-8 encoded page into records."""
+    return extract_records(html.decode("utf-8"), config, mode)
+
+
+def parse_datetime(value: str) -> Optional[datetime]:
+    """Parse an ISO 8601 or RFC 822 timestamp into naive local time.
+
+    Feeds, sitemaps and page metadata use these formats; articles elsewhere
+    carry naive dates, so aware values are converted to local time.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _page_soup(html: str) -> BeautifulSoup:
+    try:
+        return BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser")
+
+
+def find_next_page(html: str, base_url: str, selector: Optional[str]) -> Optional[str]:
+    """Absolute URL of the next listing page, or None on the last one."""
+    element = _page_soup(html).select_one(selector or DEFAULT_NEXT_PAGE_SELECTOR)
+    if element is not None and element.name not in ("a", "link"):
+        element = element.find("a")
+    if element is None or not element.get("href"):
+        return None
+    return urljoin(base_url, element["href"])
+
+
+def extract_detail(html: str, config: WebsiteConfig) -> DetailRecord:
+    """Extract the body, title and date from an article's own page.
+
+    The body is the text of every element matching
+    ``detail_content_selector`` (``content_selector`` if unset).
+    """
+    soup = _page_soup(html)
+    selector = config.detail_content_selector or config.content_selector
+    content = "\n".join(
+        element.get_text("\n", strip=True) for element in soup.select(selector)
+    )
+
+    title = None
+    for title_selector in DETAIL_TITLE_SELECTORS:
+        element = soup.select_one(title_selector)
+        if element is not None:
+            text = element.get("content") or element.get_text(strip=True)
+            if text:
+                title = text.strip()
+                break
+
+    published_date = None
+    for date_selector in DETAIL_DATE_SELECTORS:
+        element = soup.select_one(date_selector)
+        if element is not None:
+            published_date = parse_datetime(
+                element.get("content") or element.get("datetime") or ""
+            )
+            if published_date is not None:
+                break
+
+    return DetailRecord(title, content, published_date)
+
+
+def parse_detail(html: bytes, config: WebsiteConfig) -> DetailRecord:
+    """Process-pool entry point: parse a UTF-8 encoded article page."""
+    return extract_detail(html.decode("utf-8"), config)
@@ -0,0 +1,232 @@
+# pipeline.py
+import asyncio
+import logging
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from article_store import FAILED_SUMMARIES, ArticleStore
+from config import DEDUP_SETTINGS, LLM_SETTINGS, PIPELINE_SETTINGS
+from dedup import Deduplicator, copy_summary
+from models import Article
+from refresh_scheduler import RefreshScheduler
+from scraper import NewsScraperAgent
+
+
+class ArticlePipeline:
+    """Streaming scrape → filter → dedupe → summarize pipeline.
+
+    Each website's articles enter a bounded queue as soon as that site has
+    been scraped, a fixed pool of workers summarizes them, and ``stream``
+    yields every article the moment its summary is ready. The bounded queues
+    keep memory flat and apply backpressure to the scraping stage.
+
+    Near-duplicates of an article that is already summarized, or still being
+    summarized, skip the workers and reuse that article's summary.
+
+    With ``process_batch`` each worker hands the processor batches of the
+    articles queued up together instead of single articles.
+
+    With a ``refresh_scheduler`` only the websites it reports as due are
+    scraped, and every scrape result is recorded back into its schedule.
+    """
+
+    def __init__(
+        self,
+        scraper: NewsScraperAgent,
+        process_article: Callable[[Article], Awaitable[Article]],
+        store: Optional[ArticleStore] = None,
+        queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        deduplicator: Optional[Deduplicator] = None,
+        refresh_scheduler: Optional[RefreshScheduler] = None,
+        process_batch: Optional[
+            Callable[[List[Article]], Awaitable[List[Article]]]
+        ] = None,
+    ):
+        self.scraper = scraper
+        self.process_article = process_article
+        self.store = store
+        self.queue_size = queue_size or PIPELINE_SETTINGS["queue_size"]
+        self.workers = workers or PIPELINE_SETTINGS["summarize_workers"]
+        if deduplicator is None and DEDUP_SETTINGS["enabled"]:
+            deduplicator = Deduplicator(store)
+        self.deduplicator = deduplicator
+        self.refresh_scheduler = refresh_scheduler
+        self.process_batch = process_batch
+        self.batch_size = LLM_SETTINGS["batch_max_articles"]
+        self.batch_linger = PIPELINE_SETTINGS["batch_linger"]
+        self._collecting = asyncio.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        # Canonical articles of this run, keyed by id
+        self._in_flight: Set[str] = set()
+        self._processed: Dict[str, Article] = {}
+        self._waiting: Dict[str, List[Article]] = {}
+
+    def _find_canonical(self, article_id: str) -> Optional[Article]:
+        canonical = self._processed.get(article_id)
+        if canonical is None and self.store is not None:
+            canonical = self.store.get_article(article_id)
+        if canonical is None or canonical.summary in FAILED_SUMMARIES:
+            return None
+        return canonical
+
+    async def _emit(self, article: Article, done: asyncio.Queue) -> None:
+        if self.store is not None:
+            self.store.upsert([article])
+        await done.put(article)
+
+    async def _route(
+        self, article: Article, pending: asyncio.Queue, done: asyncio.Queue
+    ) -> None:
+        """Send an article to the workers unless a near-duplicate covers it."""
+        canonical_id = None
+        if self.deduplicator is not None:
+            canonical_id = self.deduplicator.find_duplicate(article)
+
+        if canonical_id is None:
+            self._in_flight.add(article.id)
+            await pending.put(article)
+        elif canonical_id in self._in_flight:
+            self._waiting.setdefault(canonical_id, []).append(article)
+        else:
+            canonical = self._find_canonical(canonical_id)
+            if canonical is None:
+                await pending.put(article)
+            else:
+                await self._emit(copy_summary(article, canonical), done)
+
+    async def _scrape_stage(self, pending: asyncio.Queue, done: asyncio.Queue) -> None:
+        configs = None
+        if self.refresh_scheduler is not None:
+            configs = self.refresh_scheduler.due(self.scraper.websites_config)
+        try:
+            async for result in self.scraper.stream_websites(configs):
+                if self.refresh_scheduler is not None:
+                    self.refresh_scheduler.record(result)
+                if not result.success:
+                    continue
+                articles = result.articles
+                if self.store is not None:
+                    articles = self.store.filter_new(articles)
+                for article in articles:
+                    await self._route(article, pending, done)
+        except Exception as e:
+            self.logger.error(f"Error in scraping stage: {str(e)}")
+        finally:
+            for _ in range(self.workers):
+                await pending.put(None)
+
+    async def _process(self, article: Article) -> Optional[Article]:
+        try:
+            return await self.process_article(article)
+        except Exception as e:
+            self.logger.error(f"Error processing article {article.id}: {str(e)}")
+            return None
+
+    async def _next_batch(self, pending: asyncio.Queue) -> Tuple[List[Article], bool]:
+        """Take the next article, plus any that arrive soon after in batch mode.
+
+        Returns the articles and whether this worker's end marker was taken.
+        One worker collects at a time, so batches fill up instead of every
+        idle worker taking a few articles each.
+        """
+        if self.process_batch is None:
+            article = await pending.get()
+            return ([], True) if article is None else ([article], False)
+
+        async with self._collecting:
+            article = await pending.get()
+            if article is None:
+                return [], True
+            batch = [article]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.batch_linger
+            while len(batch) < self.batch_size:
+                try:
+                    article = await asyncio.wait_for(
+                        pending.get(), max(0.0, deadline - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if article is None:
+                    return batch, True
+                batch.append(article)
+            return batch, False
+
+    async def _process_all(self, articles: List[Article]) -> List[Optional[Article]]:
+        if self.process_batch is not None and len(articles) > 1:
+            try:
+                return list(await self.process_batch(articles))
+            except Exception as e:
+                self.logger.error(
+                    f"Error processing batch of {len(articles)}: {str(e)}"
+                )
+        return list(await asyncio.gather(*(self._process(a) for a in articles)))
+
+    async def _finish(
+        self, article: Article, processed: Optional[Article], done: asyncio.Queue
+    ) -> None:
+        """Emit a processed article along with its waiting near-duplicates."""
+        self._in_flight.discard(article.id)
+        waiting = self._waiting.pop(article.id, [])
+        if processed is not None and processed.summary not in FAILED_SUMMARIES:
+            self._processed[article.id] = processed
+            results = [processed]
+            results.extend(copy_summary(item, processed) for item in waiting)
+        else:
+            # Without a canonical summary each duplicate is processed itself
+            results = [] if processed is None else [processed]
+            for item in waiting:
+                item = await self._process(item)
+                if item is not None:
+                    results.append(item)
+
+        for result in results:
+            try:
+                await self._emit(result, done)
+            except Exception as e:
+                self.logger.error(f"Error storing article {result.id}: {str(e)}")
+
+    async def _summarize_stage(
+        self, pending: asyncio.Queue, done: asyncio.Queue
+    ) -> None:
+        finished = False
+        while not finished:
+            batch, finished = await self._next_batch(pending)
+            processed = await self._process_all(batch)
+            for article, result in zip(batch, processed):
+                await self._finish(article, result, done)
+        await done.put(None)
+
+    async def stream(self) -> AsyncIterator[Article]:
+        """Yield processed articles as they complete."""
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        tasks = [asyncio.create_task(self._scrape_stage(pending, done))]
+        tasks.extend(
+            asyncio.create_task(self._summarize_stage(pending, done))
+            for _ in range(self.workers)
+        )
+
+        finished_workers = 0
+        try:
+            while finished_workers < self.workers:
+                article = await done.get()
+                if article is None:
+                    finished_workers += 1
+                    continue
+                yield article
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,166 @@
+# refresh_scheduler.py
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from config import REFRESH_SETTINGS, SCRAPING_SETTINGS
+from models import ScrapingResult, SourceState, WebsiteConfig
+
+
+class RefreshScheduler:
+    """Decides which websites are due for a scrape from their publish history.
+
+    Each successful scrape updates a website's publish rate, an exponentially
+    weighted average of new articles per hour, and the website is polled
+    again once about ``target_new_per_poll`` new articles are expected,
+    within ``min_interval`` and ``max_interval``. Failed scrapes are retried
+    after ``retry_delay`` with exponential backoff; ``max_retries`` failures
+    in a row open a circuit breaker that pauses the website for
+    ``breaker_cooldown``, doubling while the trial scrapes keep failing.
+
+    State is kept in a JSON file so the schedule survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or REFRESH_SETTINGS["state_path"]
+        self.min_interval = REFRESH_SETTINGS["min_interval"]
+        self.max_interval = REFRESH_SETTINGS["max_interval"]
+        self.target_new = REFRESH_SETTINGS["target_new_per_poll"]
+        self.half_life = REFRESH_SETTINGS["rate_half_life"]
+        self.breaker_cooldown = REFRESH_SETTINGS["breaker_cooldown"]
+        self.max_known_ids = REFRESH_SETTINGS["known_ids"]
+        self.max_retries = SCRAPING_SETTINGS["max_retries"]
+        self.retry_delay = SCRAPING_SETTINGS["retry_delay"]
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.states: Dict[str, SourceState] = self._load()
+
+    def _load(self) -> Dict[str, SourceState]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return {name: SourceState(**state) for name, state in data.items()}
+        except Exception as e:
+            self.logger.error(f"Error loading refresh state: {str(e)}")
+            return {}
+
+    def save(self) -> None:
+        """Write the state atomically so a crash never leaves a partial file."""
+        with self._lock:
+            data = {
+                name: state.model_dump(mode="json")
+                for name, state in self.states.items()
+            }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def _state(self, name: str) -> SourceState:
+        if name not in self.states:
+            self.states[name] = SourceState(name=name)
+        return self.states[name]
+
+    def due(
+        self, configs: Iterable[WebsiteConfig], now: Optional[datetime] = None
+    ) -> List[WebsiteConfig]:
+        """Return the websites whose next scrape is due."""
+        now = now or datetime.now()
+        with self._lock:
+            return [
+                config for config in configs if self._state(config.name).next_due <= now
+            ]
+
+    def next_due(self, configs: Iterable[WebsiteConfig]) -> datetime:
+        """When the earliest of the given websites is due."""
+        with self._lock:
+            return min(
+                (self._state(config.name).next_due for config in configs),
+                default=datetime.now() + timedelta(seconds=self.max_interval),
+            )
+
+    def record(self, result: ScrapingResult, now: Optional[datetime] = None) -> None:
+        """Update a website's schedule from the outcome of scraping it."""
+        if result.source is None:
+            return
+        now = now or datetime.now()
+        with self._lock:
+            state = self._state(result.source)
+            if result.success:
+                self._record_success(state, result, now)
+            else:
+                self._record_failure(state, now)
+
+    def _estimate_rate(
+        self,
+        state: SourceState,
+        result: ScrapingResult,
+        new_count: int,
+        now: datetime,
+    ) -> float:
+        if state.last_checked is None:
+            # First sight of the website: use the spread of the listed dates
+            dates = sorted(article.published_date for article in result.articles)
+            span = (dates[-1] - dates[0]).total_seconds() / 3600 if dates else 0
+            return (len(dates) - 1) / span if span > 0 else 0.0
+
+        elapsed = max((now - state.last_checked).total_seconds(), 1.0)
+        observed = new_count / (elapsed / 3600)
+        weight = 1 - 0.5 ** (elapsed / self.half_life)
+        return weight * observed + (1 - weight) * state.publish_rate
+
+    def _record_success(
+        self, state: SourceState, result: ScrapingResult, now: datetime
+    ) -> None:
+        ids = [article.id for article in result.articles]
+        known = set(state.known_ids)
+        new_count = sum(1 for article_id in ids if article_id not in known)
+        if new_count and state.last_checked is not None:
+            state.last_new_article = now
+
+        state.publish_rate = self._estimate_rate(state, result, new_count, now)
+        current = set(ids)
+        state.known_ids = (
+            ids
+            + [
+                article_id
+                for article_id in state.known_ids
+                if article_id not in current
+            ]
+        )[: self.max_known_ids]
+
+        if state.publish_rate > 0:
+            interval = self.target_new / state.publish_rate * 3600
+        else:
+            interval = self.max_interval
+        state.interval = min(self.max_interval, max(self.min_interval, interval))
+        state.next_due = now + timedelta(seconds=state.interval)
+        state.last_checked = now
+        if state.circuit_open:
+            self.logger.info(f"Circuit closed for {state.name}")
+        state.consecutive_failures = 0
+        state.circuit_open = False
+
+    def _record_failure(self, state: SourceState, now: datetime) -> None:
+        state.consecutive_failures += 1
+        if state.consecutive_failures < self.max_retries:
+            delay = self.retry_delay * 2 ** (state.consecutive_failures - 1)
+        else:
+            # Open (or keep open) the circuit; the next due scrape is the trial
+            excess = state.consecutive_failures - self.max_retries
+            delay = min(self.max_interval, self.breaker_cooldown * 2**excess)
+            if not state.circuit_open:
+                self.logger.warning(
+                    f"Circuit opened for {state.name} after "
+                    f"{state.consecutive_failures} failures"
+                )
+            state.circuit_open = True
+        state.next_due = now + timedelta(seconds=delay)
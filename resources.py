@@ -0,0 +1,140 @@
+# resources.py
+"""Process-wide resources shared by every Streamlit session and rerun.
+
+Streamlit re-executes the app script on every interaction and runs each
+browser session separately; the cached factories below make clients, parsed
+configs and the filtered article tables exist once per server process instead.
+
+Modules only needed to scrape or call the LLM (groq, aiohttp, bs4,
+pydantic-settings) are imported by their factories, so a UI that only reads
+stored articles starts without loading them.
+"""
+
+import json
+import os
+from datetime import date, datetime, time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import pyarrow as pa
+import streamlit as st
+
+from article_store import ArticleStore
+from columnar_store import ColumnarArticleStore
+from config import CACHE_SETTINGS, WEBSITE_CONFIGS
+from dedup import Deduplicator
+from embeddings import SemanticIndex
+from llm_cache import LLMCache
+from llm_scheduler import LLMScheduler
+from models import WebsiteConfig
+
+if TYPE_CHECKING:
+    from ai_processor import AIProcessor
+    from models import Settings
+    from scraper import NewsScraperAgent
+
+WEBSITES_JSON = "config/websites.json"
+
+
+@st.cache_resource
+def get_settings() -> "Settings":
+    from models import Settings
+
+    return Settings()
+
+
+@st.cache_resource
+def load_website_configs(path: str = WEBSITES_JSON) -> List[WebsiteConfig]:
+    """Load website configs from JSON, falling back to ``WEBSITE_CONFIGS``.
+
+    The file may hold a list of configs or a mapping keyed like
+    ``WEBSITE_CONFIGS``; a missing or empty file uses ``WEBSITE_CONFIGS``.
+    """
+    configs = WEBSITE_CONFIGS
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "r") as f:
+            configs = json.load(f)
+    if isinstance(configs, dict):
+        configs = list(configs.values())
+    return [WebsiteConfig(**config) for config in configs]
+
+
+@st.cache_resource
+def get_article_store() -> ArticleStore:
+    return ArticleStore()
+
+
+@st.cache_resource
+def get_deduplicator() -> Deduplicator:
+    return Deduplicator(get_article_store())
+
+
+@st.cache_resource
+def get_semantic_index() -> SemanticIndex:
+    return SemanticIndex()
+
+
+@st.cache_resource
+def get_llm_cache() -> LLMCache:
+    return LLMCache()
+
+
+@st.cache_resource
+def get_llm_scheduler() -> LLMScheduler:
+    api_key = get_settings().groq_api_key
+
+    def create_client():
+        import groq
+
+        return groq.AsyncGroq(api_key=api_key, max_retries=0)
+
+    return LLMScheduler(client_factory=create_client)
+
+
+@st.cache_resource
+def get_scraper() -> "NewsScraperAgent":
+    from scraper import NewsScraperAgent
+
+    return NewsScraperAgent(load_website_configs(), article_store=get_article_store())
+
+
+@st.cache_resource
+def get_ai_processor() -> "AIProcessor":
+    from ai_processor import AIProcessor
+
+    return AIProcessor(api_key=get_settings().groq_api_key, cache=get_llm_cache())
+
+
+@st.cache_resource
+def get_archive() -> ColumnarArticleStore:
+    return ColumnarArticleStore()
+
+
+@st.cache_resource(
+    ttl=CACHE_SETTINGS["articles_ttl"], max_entries=CACHE_SETTINGS["article_tables"]
+)
+def get_article_table(
+    sources: Optional[Tuple[str, ...]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> pa.Table:
+    """Archived articles without content as a shared Arrow table.
+
+    The sources and days are pushed into the dataset scan, so only their
+    partitions are read; whole days keep the cache key stable across reruns
+    and callers narrow the result with ``filter_table``. Falls back to the
+    article store until ingest.py has written an archive.
+    """
+    start = None if date_from is None else datetime.combine(date_from, time.min)
+    end = None if date_to is None else datetime.combine(date_to, time.max)
+    sources = None if sources is None else list(sources)
+    table = get_archive().load_table(sources=sources, date_from=start, date_to=end)
+    if table.num_rows == 0:
+        table = ColumnarArticleStore.from_articles(
+            get_article_store().get_articles(sources, start, end)
+        )
+    return table
+
+
+def refresh_articles() -> None:
+    """Drop the shared article tables so the next read loads them lazily."""
+    get_article_table.clear()
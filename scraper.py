@@ -1,23 +1,53 @@
 # scraper.py
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List, Dict
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, List, Dict, Optional, Tuple
 import logging
-from models import Article, WebsiteConfig, ScrapingResult, Settings
+from pydantic import HttpUrl
+from models import Article, WebsiteConfig, ScrapingResult
 import hashlib
-from config import WEBSITE_CONFIGS
+from config import WEBSITE_CONFIGS, SCRAPING_SETTINGS
+from crawler import Crawler
+from fetcher import AsyncFetcher
+from http_cache import HTTPCache
+from metrics import ARTICLES_FAILED, ARTICLES_PARSED
+from parsing import (
+    ArticleRecord,
+    DetailRecord,
+    extract_detail,
+    extract_records,
+    parse_detail,
+    parse_page,
+)
+
+if TYPE_CHECKING:
+    from article_store import ArticleStore
 
 
 class NewsScraperAgent:
-    def __init__(self):
-        self.settings = Settings()
-        self.websites_config = [
+    def __init__(
+        self,
+        websites_config: Optional[List[WebsiteConfig]] = None,
+        http_cache: Optional[HTTPCache] = None,
+        parse_workers: Optional[int] = None,
+        article_store: Optional["ArticleStore"] = None,
+    ):
+        self.websites_config = websites_config or [
             WebsiteConfig(**config) for config in WEBSITE_CONFIGS.values()
         ]
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        self.headers = {"User-Agent": SCRAPING_SETTINGS["user_agent"]}
+        self.http_cache = http_cache if http_cache is not None else HTTPCache()
+        # Parsed records per listing page URL, reused when the page answers 304
+        self._parsed_pages: Dict[str, List[ArticleRecord]] = {}
+        self.parse_workers = (
+            parse_workers
+            if parse_workers is not None
+            else SCRAPING_SETTINGS["parse_workers"]
+        )
+        self._parse_executor: Optional[ProcessPoolExecutor] = None
+        # Stored articles are not fetched again for their full content
+        self.article_store = article_store
         self.logger = logging.getLogger(__name__)
 
     def generate_article_id(self, url: str, title: str) -> str:
@@ -25,53 +55,139 @@ class NewsScraperAgent:
         content = f"{url}{title}".encode("utf-8")
         return hashlib.md5(content).hexdigest()
 
-    async def scrape_website(self, config: WebsiteConfig) -> ScrapingResult:
-        """Scrape articles from a single website."""
+    def stored_articles(self, urls: List[str]) -> Dict[str, Article]:
+        """Already stored articles among the given URLs, keyed by those URLs."""
+        if self.article_store is None or not urls:
+            return {}
         try:
-            response = requests.get(config.url, headers=self.headers)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            articles = []
-            for article_element in soup.select(config.article_selector):
-                try:
-                    title = article_element.select_one(
-                        config.title_selector
-                    ).text.strip()
-                    content = article_element.select_one(
-                        config.content_selector
-                    ).text.strip()
-                    date_text = article_element.select_one(
-                        config.date_selector
-                    ).text.strip()
-                    published_date = datetime.strptime(date_text, config.date_format)
-                    url = article_element.find("a")["href"]
-
-                    article = Article(
-                        id=self.generate_article_id(url, title),
-                        title=title,
-                        url=url,
-                        source=config.name,
-                        published_date=published_date,
-                        summary="",  # Will be filled by the AI processor
-                        content=content,
-                    )
-                    articles.append(article)
-                except Exception as e:
-                    self.logger.error(
-                        f"Error processing article from {config.name}: {str(e)}"
-                    )
-
-            return ScrapingResult(success=True, articles=articles)
+            # The store holds URLs as normalized by the Article model
+            normalized = {str(HttpUrl(url)): url for url in urls}
+            stored = self.article_store.get_articles_by_url(normalized)
+            return {normalized[url]: article for url, article in stored.items()}
+        except Exception as e:
+            self.logger.error(f"Error looking up stored articles: {str(e)}")
+            return {}
+
+    def create_fetcher(self) -> AsyncFetcher:
+        """Create a fetcher backed by the scraper's HTTP cache."""
+        return AsyncFetcher(headers=self.headers, cache=self.http_cache)
+
+    def build_articles(
+        self, records: List[ArticleRecord], errors: List[str], config: WebsiteConfig
+    ) -> List[Article]:
+        """Turn extracted records into articles, logging extraction errors."""
+        for error in errors:
+            self.logger.error(f"Error processing article from {config.name}: {error}")
+
+        failed = len(errors)
+        articles = []
+        for record in records:
+            try:
+                article = Article(
+                    id=self.generate_article_id(record.url, record.title),
+                    title=record.title,
+                    url=record.url,
+                    source=config.name,
+                    published_date=record.published_date,
+                    summary="",  # Will be filled by the AI processor
+                    content=record.content,
+                )
+                articles.append(article)
+            except Exception as e:
+                failed += 1
+                self.logger.error(
+                    f"Error processing article from {config.name}: {str(e)}"
+                )
+
+        ARTICLES_PARSED.inc(len(articles), source=config.name)
+        ARTICLES_FAILED.inc(failed, source=config.name)
+        return articles
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._parse_executor is None:
+            # Spawned workers avoid forking a process that holds threads and locks
+            self._parse_executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._parse_executor
+
+    async def extract_records_async(
+        self, html: str, config: WebsiteConfig
+    ) -> Tuple[List[ArticleRecord], List[str]]:
+        """Extract a listing page's records in the worker pool, or inline."""
+        if self.parse_workers <= 0:
+            return extract_records(html, config, SCRAPING_SETTINGS["parser"])
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor(),
+            parse_page,
+            html.encode("utf-8"),
+            config,
+            SCRAPING_SETTINGS["parser"],
+        )
+
+    async def extract_detail_async(
+        self, html: str, config: WebsiteConfig
+    ) -> DetailRecord:
+        """Extract an article page in the worker pool, or inline."""
+        if self.parse_workers <= 0:
+            return extract_detail(html, config)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor(), parse_detail, html.encode("utf-8"), config
+        )
+
+    def close(self) -> None:
+        """Shut down the parse worker pool, if one was started."""
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown()
+            self._parse_executor = None
+
+    async def scrape_website(
+        self, config: WebsiteConfig, fetcher: Optional[AsyncFetcher] = None
+    ) -> ScrapingResult:
+        """Scrape articles from a single website.
+
+        The ``Crawler`` finds the articles through the website's feed,
+        sitemap or listing pages. Pass a shared ``fetcher`` to reuse its
+        connection pool; otherwise a short-lived one is opened for this call.
+        """
+        try:
+            if fetcher is None:
+                async with self.create_fetcher() as own_fetcher:
+                    records, errors = await Crawler(self, own_fetcher).crawl(config)
+            else:
+                records, errors = await Crawler(self, fetcher).crawl(config)
+            articles = self.build_articles(records, errors, config)
+            return ScrapingResult(success=True, source=config.name, articles=articles)
 
         except Exception as e:
             self.logger.error(f"Error scraping {config.name}: {str(e)}")
-            return ScrapingResult(success=False, errors=[str(e)])
-
-    async def scrape_all_websites(self) -> List[ScrapingResult]:
-        """Scrape articles from all configured websites."""
-        results = []
-        for config in self.websites_config:
-            result = await self.scrape_website(config)
-            results.append(result)
-        return results
+            return ScrapingResult(success=False, source=config.name, errors=[str(e)])
+
+    async def scrape_all_websites(
+        self, configs: Optional[List[WebsiteConfig]] = None
+    ) -> List[ScrapingResult]:
+        """Scrape articles from all (or the given) websites concurrently."""
+        configs = self.websites_config if configs is None else configs
+        async with self.create_fetcher() as fetcher:
+            results = await asyncio.gather(
+                *(self.scrape_website(config, fetcher) for config in configs)
+            )
+        return list(results)
+
+    async def stream_websites(
+        self, configs: Optional[List[WebsiteConfig]] = None
+    ) -> AsyncIterator[ScrapingResult]:
+        """Yield each website's result as soon as it has been scraped."""
+        configs = self.websites_config if configs is None else configs
+        async with self.create_fetcher() as fetcher:
+            tasks = [
+                asyncio.create_task(self.scrape_website(config, fetcher))
+                for config in configs
+            ]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield await next_result
+            finally:
+                for task in tasks:
+                    task.cancel()
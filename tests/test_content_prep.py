@@ -0,0 +1,53 @@
+# tests/test_content_prep.py
+from datetime import datetime
+
+import pytest
+
+from ai_processor import AIProcessor
+from article_store import ArticleStore
+from content_prep import clean_content
+from models import Article
+
+
+@pytest.mark.parametrize(
+    "footer",
+    [
+        "© 2024 Acme",
+        "(c) 2024 Acme",
+        "Copyright 2024 Acme Corp.",
+        "Copyright © 2026 The Associated Press. All rights reserved.",
+        "Read more: Courts weigh AI training data",
+    ],
+)
+def test_footers_are_dropped(footer):
+    assert clean_content(f"Body text.\n{footer}") == "Body text."
+
+
+@pytest.mark.parametrize(
+    "paragraph",
+    [
+        "Copyright lawsuits against AI labs are mounting, and courts are split.",
+        "Copyright holders filed 40 suits in 2024.",
+        "See also how the ruling applies to models trained before the law "
+        "took effect, which the court left open.",
+        "The copyright office declined to comment.",
+    ],
+)
+def test_paragraphs_starting_like_footers_are_kept(paragraph):
+    assert clean_content(f"Intro.\n{paragraph}") == f"Intro.\n{paragraph}"
+
+
+def test_articles_without_text_are_not_processed_again(tmp_path):
+    article = Article(
+        id="a1",
+        title="Photo gallery",
+        url="http://x/a/1",
+        source="X",
+        published_date=datetime(2026, 10, 10),
+        summary="",
+        content="Advertisement\nShare",
+    )
+    processed = AIProcessor._use_as_summary(article.model_copy())
+    store = ArticleStore(str(tmp_path / "articles.sqlite3"))
+    store.upsert([processed])
+    assert store.filter_new([article]) == []
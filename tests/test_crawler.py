@@ -0,0 +1,126 @@
+# tests/test_crawler.py
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from article_store import ArticleStore
+from http_cache import HTTPCache
+from models import WebsiteConfig
+from parsing import PARSE_MODES, extract_records
+from scraper import NewsScraperAgent
+
+# Teaser cards: a title and a link, no body text and no date
+LISTING = """<html><body>
+<div class="card"><h2>First story</h2><a href="/a/1">Read</a></div>
+<div class="card"><h2>Second story</h2><a href="/a/2">Read</a></div>
+</body></html>"""
+
+DETAIL = """<html><head>
+<meta property="article:published_time" content="2026-10-10T08:00:00">
+</head><body><h1>Story {n}</h1><div class="body"><p>Body of story {n}</p></div>
+</body></html>"""
+
+
+def website(url: str, **overrides) -> WebsiteConfig:
+    config = {
+        "name": "Teasers",
+        "url": url,
+        "article_selector": "div.card",
+        "title_selector": "h2",
+        "content_selector": "p.teaser",
+        "date_selector": "time",
+        "date_format": "%Y-%m-%d",
+        "detail_content_selector": "div.body",
+    }
+    return WebsiteConfig(**{**config, **overrides})
+
+
+@pytest.mark.parametrize("mode", PARSE_MODES)
+def test_listing_without_body_needs_fetch_details(mode):
+    records, errors = extract_records(LISTING, website("http://x/"), mode)
+    assert records == []
+    assert len(errors) == 2
+
+    records, errors = extract_records(
+        LISTING, website("http://x/", fetch_details=True), mode
+    )
+    assert errors == []
+    assert [(r.title, r.content, r.published_date) for r in records] == [
+        ("First story", "", None),
+        ("Second story", "", None),
+    ]
+
+
+def test_parse_modes_report_the_same_errors():
+    errors = [
+        extract_records(LISTING, website("http://x/"), mode)[1] for mode in PARSE_MODES
+    ]
+    assert errors[0] == errors[1] == ["ValueError: No content found"] * 2
+
+
+async def crawl_teasers(tmp_path, polls=1, store=None, parse_workers=0):
+    """Scrape the teaser listing; return the results and detail page hits."""
+    app = web.Application()
+    detail_hits = []
+
+    async def listing(request):
+        return web.Response(text=LISTING, content_type="text/html")
+
+    async def detail(request):
+        detail_hits.append(request.path)
+        page = DETAIL.format(n=request.match_info["n"])
+        return web.Response(text=page, content_type="text/html")
+
+    app.router.add_get("/", listing)
+    app.router.add_get("/a/{n}", detail)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    scraper = NewsScraperAgent(
+        http_cache=HTTPCache(path=str(tmp_path / "http.sqlite3")),
+        parse_workers=parse_workers,
+        article_store=store,
+    )
+    try:
+        config = website(f"http://127.0.0.1:{port}/", fetch_details=True)
+        results = []
+        for _ in range(polls):
+            result = await scraper.scrape_website(config)
+            if store is not None:
+                # As the pipeline would after summarizing them
+                store.upsert(
+                    [a.model_copy(update={"summary": "S"}) for a in result.articles]
+                )
+            results.append(result)
+        return results, detail_hits
+    finally:
+        scraper.close()
+        await runner.cleanup()
+
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_detail_pages_fill_in_listing_without_body(tmp_path, parse_workers):
+    [result], _ = asyncio.run(crawl_teasers(tmp_path, parse_workers=parse_workers))
+
+    assert result.success
+    assert [(a.title, a.content) for a in result.articles] == [
+        ("First story", "Body of story 1"),
+        ("Second story", "Body of story 2"),
+    ]
+    assert all(a.published_date.day == 10 for a in result.articles)
+
+
+def test_stored_articles_are_not_fetched_again(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite3"))
+    (first, second), detail_hits = asyncio.run(
+        crawl_teasers(tmp_path, polls=2, store=store)
+    )
+
+    assert sorted(detail_hits) == ["/a/1", "/a/2"]
+    assert [(a.id, a.content) for a in second.articles] == [
+        (a.id, a.content) for a in first.articles
+    ]
+    assert store.filter_new(second.articles) == []
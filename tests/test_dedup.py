@@ -0,0 +1,58 @@
+# tests/test_dedup.py
+import pytest
+
+from benchmarks.bench_dedup import corpus, measure
+from dedup import Deduplicator
+from models import Article
+
+
+@pytest.fixture(scope="module")
+def results():
+    return measure(corpus(200))
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        "words 1%",
+        "words 5%",
+        "words 10%",
+        "reworded lead",
+        "byline+footer",
+        "trimmed ending",
+    ],
+)
+def test_edited_copies_are_found(results, edit):
+    assert results[edit] >= 0.9
+
+
+def test_heavily_edited_copies_are_mostly_found(results):
+    # Short texts lose most of their shingles to a combined edit
+    assert results["all of the above"] >= 0.6
+
+
+def test_distinct_texts_are_rarely_matched(results):
+    assert results["false positives"] <= 0.1
+
+
+def test_duplicate_points_at_first_copy():
+    text = corpus(1)[0]
+    article = Article(
+        id="first",
+        title="Original",
+        url="https://example.com/a",
+        source="Wire",
+        published_date="2026-10-10T08:00:00",
+        summary="",
+        content=text,
+    )
+    copy = article.model_copy(
+        update={
+            "id": "copy",
+            "title": "Reworded headline",
+            "content": f"By Jane Doe, Reuters. {text}",
+        }
+    )
+    deduplicator = Deduplicator()
+    assert deduplicator.find_duplicate(article) is None
+    assert deduplicator.find_duplicate(copy) == "first"
@@ -0,0 +1,63 @@
+# tests/test_embeddings.py
+import multiprocessing
+
+import numpy as np
+
+from embeddings import VectorIndex
+
+DIM = 8
+
+
+def vector(article_id: str) -> np.ndarray:
+    """A vector that identifies its article."""
+    return np.full(DIM, float(int(article_id.split("-")[-1])), dtype=np.float32)
+
+
+def add_range(path: str, prefix: str, count: int, chunk: int = 5) -> None:
+    index = VectorIndex(DIM, "test", path)
+    for start in range(0, count, chunk):
+        ids = [f"{prefix}-{n}" for n in range(start, min(count, start + chunk))]
+        index.add(ids, np.stack([vector(article_id) for article_id in ids]))
+
+
+def assert_paired(index: VectorIndex, ids) -> None:
+    found, vectors = index.vectors(ids)
+    assert found == list(ids)
+    for article_id, row in zip(found, vectors):
+        assert np.array_equal(row, vector(article_id)), article_id
+
+
+def test_interrupted_write_is_trimmed(tmp_path):
+    path = str(tmp_path)
+    add_range(path, "a", 10)
+    index = VectorIndex(DIM, "test", path)
+    # A crash after writing two rows but only part of their ids
+    with open(index.vectors_path, "ab") as f:
+        f.write(np.stack([vector("x-98"), vector("x-99")]).tobytes())
+    with open(index.ids_path, "a") as f:
+        f.write("x-98\nx-9")
+
+    add_range(path, "b", 10)
+    index = VectorIndex(DIM, "test", path)
+    assert_paired(index, [f"a-{n}" for n in range(10)] + [f"b-{n}" for n in range(10)])
+    # x-98 was written completely; x-99 lost part of its id
+    assert_paired(index, ["x-98"])
+    assert index.vectors(["x-99"])[0] == []
+
+
+def test_concurrent_writers_keep_ids_and_rows_paired(tmp_path):
+    path = str(tmp_path)
+    VectorIndex(DIM, "test", path)
+    context = multiprocessing.get_context("spawn")
+    writers = [
+        context.Process(target=add_range, args=(path, prefix, 400, 1))
+        for prefix in "pqrs"
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert all(writer.exitcode == 0 for writer in writers)
+
+    index = VectorIndex(DIM, "test", path)
+    assert_paired(index, [f"{p}-{n}" for p in "pqrs" for n in range(400)])
@@ -0,0 +1,37 @@
+# tests/test_fetcher.py
+import asyncio
+
+from aiohttp import web
+
+from fetcher import AsyncFetcher
+
+
+async def fetch_slow_pages(requests: int, latency: float, timeout: float):
+    async def slow(request):
+        await asyncio.sleep(latency)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/{n}", slow)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with AsyncFetcher(max_per_host=2, timeout=timeout) as fetcher:
+            return await asyncio.gather(
+                *(
+                    fetcher.fetch(f"http://127.0.0.1:{port}/{n}")
+                    for n in range(requests)
+                ),
+                return_exceptions=True,
+            )
+    finally:
+        await runner.cleanup()
+
+
+def test_waiting_for_a_host_slot_does_not_count_toward_the_timeout():
+    # Five rounds of two requests take about 1 s, well past the timeout
+    responses = asyncio.run(fetch_slow_pages(10, latency=0.2, timeout=0.5))
+    assert [getattr(r, "text", r) for r in responses] == ["ok"] * 10